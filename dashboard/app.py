@@ -3,25 +3,16 @@ Visualization Dashboard for Cloud Honey Tokens
 Real-time attack monitoring and analytics
 """
 
-import os
-from datetime import datetime, timedelta
-from dash import Dash, html, dcc, Input, Output
-import plotly.graph_objs as go
-import plotly.express as px
-from dotenv import load_dotenv
-import sys
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import os
 import sys
-from datetime import datetime, timedelta
-from dash import Dash, html, dcc, Input, Output
-import plotly.graph_objs as go
-import plotly.express as px
+from collections import namedtuple
+from dash import Dash, html, dcc, dash_table, Input, Output, State, ClientsideFunction, ctx
+from dash.exceptions import PreventUpdate
+import plotly.io as pio
 from dotenv import load_dotenv
-import boto3
-from decimal import Decimal
+from flask_caching import Cache
+import numpy as np
+import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -29,16 +20,67 @@ from src.analysis.cloudwatch_analyzer import CloudWatchAnalyzer
 
 load_dotenv()
 
-app = Dash(__name__, title="Cloud Honey Tokens Dashboard")
+app = Dash(__name__, title="Cloud Honey Tokens Dashboard", compress=True)
+
+app.server.config.update(
+    COMPRESS_MIMETYPES=['application/json', 'text/html', 'text/css', 'application/javascript'],
+    COMPRESS_LEVEL=6,
+    COMPRESS_MIN_SIZE=1024
+)
+
+cache = Cache(app.server, config={
+    'CACHE_TYPE': os.getenv('DASHBOARD_CACHE_TYPE', 'FileSystemCache'),
+    'CACHE_DIR': os.getenv('DASHBOARD_CACHE_DIR', '/tmp/dash-cache'),
+    'CACHE_REDIS_URL': os.getenv('DASHBOARD_CACHE_REDIS_URL', ''),
+    'CACHE_DEFAULT_TIMEOUT': int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 30))
+})
 
 region = os.getenv('AWS_REGION', 'us-east-1')
 
+MAX_RANGE_HOURS = 168
+TIMELINE_MAX_POINTS = int(os.getenv('TIMELINE_MAX_POINTS', 500))
+
+pio.templates.default = 'plotly_white'
+
+# Dash serializes callback responses through plotly's JSON encoder
+pio.json.config.default_engine = 'orjson'
+
+# Figures are built as plain dicts, skipping plotly's property validation.
+# plotly.js does not resolve template names, so the template is embedded.
+PLOTLY_WHITE = pio.templates['plotly_white'].to_plotly_json()
+EMPTY_FIGURE = {'data': [], 'layout': {'template': PLOTLY_WHITE}}
+
+BASE_LAYOUT = dict(
+    template=PLOTLY_WHITE,
+    plot_bgcolor='white',
+    paper_bgcolor='white',
+    font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="#1a1a1a"),
+    margin=dict(l=60, r=30, t=60, b=60)
+)
+TITLE_FONT = dict(size=16, color="#1a1a1a")
+
 try:
     analyzer = CloudWatchAnalyzer(region=region)
 except Exception as e:
     print(f"Warning: Could not initialize analyzer: {e}")
     analyzer = None
 
+
+@cache.memoize()
+def fetch_events(hours, latest=None):
+    """Fetch recent events, shared across sessions for the cache TTL.
+    
+    latest is only part of the cache key, so a newly stored event bypasses the cache.
+    """
+    return analyzer.get_recent_events(hours=hours) or []
+
+
+@cache.memoize()
+def fetch_latest_event_timestamp():
+    """Newest stored event timestamp, shared across sessions for the cache TTL"""
+    return analyzer.get_latest_event_timestamp(lookback_days=MAX_RANGE_HOURS // 24)
+
+
 app.layout = html.Div([
     html.Div([
         html.Div([
@@ -59,7 +101,7 @@ app.layout = html.Div([
         'alignItems': 'center',
         'padding': '25px 40px',
         'backgroundColor': '#ffffff',
-        'borderBottom': '1px solid #e0e0e0'
+        'borderBottom': '1px solid #e0e0e0',
         'marginBottom': '0'
     }),
     
@@ -69,6 +111,11 @@ app.layout = html.Div([
         n_intervals=0
     ),
     
+    dcc.Store(id='events-store'),
+    dcc.Store(id='latest-event'),
+    dcc.Store(id='filtered-events'),
+    dcc.Store(id='aggregates-store'),
+    
     html.Div([
         html.Div([
             html.Label('Time Range', style={'fontSize': '13px', 'fontWeight': '500', 'color': '#1a1a1a'}),
@@ -119,25 +166,41 @@ app.layout = html.Div([
             ], className='chart-container'),
         ], style={'display': 'grid', 'gridTemplateColumns': '2fr 1fr', 'gap': '24px', 'marginBottom': '24px'}),
         
-        html.Div([
-            html.Div([
-                dcc.Graph(id='top-attackers')
-            ], className='chart-container'),
-            
-            html.Div([
-                dcc.Graph(id='attack-types')
-            ], className='chart-container'),
-        ], style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '24px', 'marginBottom': '24px'}),
+        # Charts below the fold are only rendered once the user asks for them
+        html.Button('Show More Charts', id='more-charts-button', n_clicks=0,
+                   style={
+                       'padding': '10px 24px',
+                       'backgroundColor': 'white',
+                       'color': '#007bff',
+                       'border': '1px solid #007bff',
+                       'borderRadius': '6px',
+                       'cursor': 'pointer',
+                       'fontSize': '14px',
+                       'fontWeight': '500',
+                       'marginBottom': '24px'
+                   }),
         
         html.Div([
             html.Div([
-                dcc.Graph(id='hourly-pattern')
-            ], className='chart-container'),
+                html.Div([
+                    dcc.Loading(dcc.Graph(id='top-attackers'), type='default')
+                ], className='chart-container'),
+                
+                html.Div([
+                    dcc.Loading(dcc.Graph(id='attack-types'), type='default')
+                ], className='chart-container'),
+            ], style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '24px', 'marginBottom': '24px'}),
             
             html.Div([
-                dcc.Graph(id='resource-access')
-            ], className='chart-container'),
-        ], style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '24px', 'marginBottom': '24px'}),
+                html.Div([
+                    dcc.Loading(dcc.Graph(id='hourly-pattern'), type='default')
+                ], className='chart-container'),
+                
+                html.Div([
+                    dcc.Loading(dcc.Graph(id='resource-access'), type='default')
+                ], className='chart-container'),
+            ], style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '24px', 'marginBottom': '24px'}),
+        ], id='more-charts', style={'display': 'none'}),
     ], style={'padding': '0 40px'}),
     
     html.Div([
@@ -155,426 +218,532 @@ app.layout = html.Div([
 
 
 @app.callback(
-    [Output('summary-cards', 'children'),
-     Output('events-timeline', 'figure'),
-     Output('severity-distribution', 'figure'),
-     Output('top-attackers', 'figure'),
-     Output('attack-types', 'figure'),
-     Output('hourly-pattern', 'figure'),
-     Output('resource-access', 'figure'),
-     Output('recent-events-table', 'children')],
-    [Input('time-range', 'value'),
-     Input('refresh-button', 'n_clicks'),
-     Input('interval-component', 'n_intervals')]
+    [Output('events-store', 'data'),
+     Output('latest-event', 'data')],
+    [Input('refresh-button', 'n_clicks'),
+     Input('interval-component', 'n_intervals')],
+    State('latest-event', 'data')
 )
-def update_dashboard(hours, n_clicks, n_intervals):
-    """Update all dashboard components"""
-    
+def load_events(n_clicks, n_intervals, last_seen):
+    """Fetch the widest time range once; narrower ranges are filtered in the browser"""
     if analyzer is None:
-        return (
-            html.Div("Dashboard not configured. Please set GCP_PROJECT_ID in .env", 
-                    style={'textAlign': 'center', 'color': 'red', 'padding': '50px'}),
-            go.Figure(), go.Figure(), go.Figure(), go.Figure(), go.Figure(), go.Figure(),
-            html.Div()
-        )
+        return None, None
+    
+    # Interval ticks skip the fetch when nothing new was stored; the browser-side
+    # refilter still runs on each tick, so events that aged out of the window drop off
+    latest = fetch_latest_event_timestamp()
+    if ctx.triggered_id == 'interval-component' and last_seen is not None and latest == last_seen:
+        raise PreventUpdate
     
     try:
-        events = analyzer.get_recent_events(hours=hours)
-        all_events = events if events else []
+        return fetch_events(MAX_RANGE_HOURS, latest), latest
     except:
-        all_events = []
-    
-    total_events = len(all_events)
-    critical = sum(1 for e in all_events if e.get('severity') == 'critical')
-    high = sum(1 for e in all_events if e.get('severity') == 'high')
-    medium = sum(1 for e in all_events if e.get('severity') == 'medium')
-    unique_ips = len(set(e.get('ip_address') for e in all_events if e.get('ip_address'))) if all_events else 0
-    
-    summary_cards = html.Div([
-        create_summary_card("Total Events", total_events, "", "
-        create_summary_card("Critical", critical, "", "
-        create_summary_card("High Severity", high, "", "
-        create_summary_card("Medium Severity", medium, "", "
-        create_summary_card("Unique IPs", unique_ips, "", "
-    ], style={'display': 'flex', 'gap': '20px', 'flexWrap': 'wrap'})
+        return [], latest
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='refilter'),
+    Output('filtered-events', 'data'),
+    [Input('time-range', 'value'),
+     Input('events-store', 'data'),
+     Input('interval-component', 'n_intervals')],
+    State('filtered-events', 'data')
+)
+
+
+@app.callback(
+    Output('aggregates-store', 'data'),
+    Input('filtered-events', 'data')
+)
+def update_aggregates(all_events):
+    """Aggregate the filtered events once for every chart callback"""
+    if analyzer is None:
+        return None
     
-    timeline_fig = create_timeline_chart(all_events)
+    return aggregate_events(all_events or [])._asdict()
+
+
+@app.callback(
+    Output('summary-cards', 'children'),
+    Input('aggregates-store', 'data')
+)
+def update_summary_cards(data):
+    """Update the summary cards"""
+    if data is None:
+        return html.Div("Dashboard not configured. Please set GCP_PROJECT_ID in .env", 
+                       style={'textAlign': 'center', 'color': 'red', 'padding': '50px'})
     
-    severity_fig = create_severity_pie_chart(all_events)
+    stats = EventStats(**data)
     
-    top_attackers_fig = create_top_attackers_chart(all_events)
+    return html.Div([
+        create_summary_card("Total Events", stats.total, "", "#2563eb"),
+        create_summary_card("Critical", stats.severity.get('critical', 0), "", "#dc3545"),
+        create_summary_card("High Severity", stats.severity.get('high', 0), "", "#ff9800"),
+        create_summary_card("Medium Severity", stats.severity.get('medium', 0), "", "#ffc107"),
+        create_summary_card("Unique IPs", stats.unique_ips, "", "#6c757d"),
+    ], style={'display': 'flex', 'gap': '20px', 'flexWrap': 'wrap'})
+
+
+@app.callback(
+    Output('events-timeline', 'figure'),
+    Input('aggregates-store', 'data')
+)
+def update_timeline(data):
+    """Update the events timeline"""
+    if data is None:
+        return EMPTY_FIGURE
+    return create_timeline_chart(EventStats(**data))
+
+
+@app.callback(
+    Output('severity-distribution', 'figure'),
+    Input('aggregates-store', 'data')
+)
+def update_severity_distribution(data):
+    """Update the severity pie chart"""
+    if data is None:
+        return EMPTY_FIGURE
+    return create_severity_pie_chart(EventStats(**data))
+
+
+@app.callback(
+    [Output('more-charts', 'style'),
+     Output('more-charts-button', 'style')],
+    Input('more-charts-button', 'n_clicks'),
+    prevent_initial_call=True
+)
+def show_more_charts(n_clicks):
+    """Reveal the lower charts and hide the button"""
+    return {}, {'display': 'none'}
+
+
+@app.callback(
+    Output('top-attackers', 'figure'),
+    [Input('aggregates-store', 'data'),
+     Input('more-charts-button', 'n_clicks')]
+)
+def update_top_attackers(data, n_clicks):
+    """Update the top attacker IPs chart"""
+    if not n_clicks:
+        raise PreventUpdate
+    if data is None:
+        return EMPTY_FIGURE
+    return create_top_attackers_chart(tuple(data['ips'].items()))
+
+
+@app.callback(
+    Output('attack-types', 'figure'),
+    [Input('aggregates-store', 'data'),
+     Input('more-charts-button', 'n_clicks')]
+)
+def update_attack_types(data, n_clicks):
+    """Update the attack types chart"""
+    if not n_clicks:
+        raise PreventUpdate
+    if data is None:
+        return EMPTY_FIGURE
+    return create_attack_types_chart(tuple(data['types'].items()))
+
+
+@app.callback(
+    Output('hourly-pattern', 'figure'),
+    [Input('aggregates-store', 'data'),
+     Input('more-charts-button', 'n_clicks')]
+)
+def update_hourly_pattern(data, n_clicks):
+    """Update the hourly activity chart"""
+    if not n_clicks:
+        raise PreventUpdate
+    if data is None:
+        return EMPTY_FIGURE
+    return create_hourly_pattern_chart(EventStats(**data))
+
+
+@app.callback(
+    Output('resource-access', 'figure'),
+    [Input('aggregates-store', 'data'),
+     Input('more-charts-button', 'n_clicks')]
+)
+def update_resource_access(data, n_clicks):
+    """Update the most accessed resources chart"""
+    if not n_clicks:
+        raise PreventUpdate
+    if data is None:
+        return EMPTY_FIGURE
+    return create_resource_access_chart(EventStats(**data))
+
+
+@app.callback(
+    Output('recent-events-table', 'children'),
+    Input('aggregates-store', 'data')
+)
+def update_recent_events(data):
+    """Update the recent events table"""
+    if data is None:
+        return html.Div()
+    return create_recent_events_table(data['recent'])
+
+
+EventStats = namedtuple('EventStats', [
+    'total', 'severity', 'ips', 'unique_ips', 'types', 'resources', 'hourly', 'timeline', 'recent'
+])
+
+
+EVENT_COLUMNS = ['event_id', 'timestamp', 'event_type', 'severity', 'ip_address', 'resource', 'region']
+
+
+def aggregate_events(events, recent_limit=10, top_n=10):
+    """Build every chart aggregate with vectorized pandas operations.
     
-    attack_types_fig = create_attack_types_chart(all_events)
+    All fields are plain lists and dicts so the result can live in a dcc.Store.
+    """
+    if not events:
+        return EventStats(
+            total=0,
+            severity={},
+            ips={},
+            unique_ips=0,
+            types={},
+            resources={},
+            hourly=[0] * 24,
+            timeline={'x': [], 'y': []},
+            recent=[]
+        )
+    
+    df = pd.DataFrame(events, columns=EVENT_COLUMNS)
+    df['ts'] = pd.to_datetime(df['timestamp'], utc=True, format='ISO8601').dt.tz_localize(None)
+    df['severity'] = df['severity'].astype('category')
+    df['event_type'] = df['event_type'].fillna('').astype('category')
+    hour = df['ts'].dt.hour.astype('uint16')
+    
+    # Labels are applied to the per-type counts, so raw types that prettify alike are merged below
+    types = df['event_type'].value_counts()
+    types.index = types.index.astype(str).str.replace('_', ' ').str.title()
+    ips = df['ip_address'].replace('', pd.NA).value_counts()
+    
+    timeline = df.groupby(df['ts'].dt.floor('h')).size()
+    hours = timeline.index
+    counts = timeline.to_numpy()
+    
+    if len(hours) > TIMELINE_MAX_POINTS:
+        keep = lttb_indices(hours.asi8, counts, TIMELINE_MAX_POINTS)
+        hours = hours[keep]
+        counts = counts[keep]
+    
+    recent = df.nlargest(recent_limit, 'ts')
+    resource = recent['resource'].fillna('N/A')
+    recent = pd.DataFrame({
+        'timestamp': recent['ts'].dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'event_type': recent['event_type'].astype(object).fillna('unknown').str.replace('_', ' ').str.title(),
+        'severity': recent['severity'].astype(object).fillna('low').str.upper(),
+        'ip_address': recent['ip_address'].fillna('N/A'),
+        'resource': resource.where(resource.str.len() <= 45, resource.str[:45] + '...')
+    })
+    
+    return EventStats(
+        total=len(df),
+        severity=df['severity'].value_counts().to_dict(),
+        ips=ips.head(top_n).to_dict(),
+        unique_ips=len(ips),
+        types=types.groupby(level=0).sum().to_dict(),
+        resources=df['resource'].replace('', pd.NA).value_counts().head(top_n).to_dict(),
+        hourly=hour.value_counts().reindex(range(24), fill_value=0).tolist(),
+        timeline={'x': hours.strftime('%Y-%m-%d %H:%M:%S').tolist(), 'y': counts.tolist()},
+        recent=recent.to_dict('records')
+    )
+
+
+def lttb_indices(x, y, n_out):
+    """Select n_out representative points using Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
     
-    hourly_fig = create_hourly_pattern_chart(all_events)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
     
-    resource_fig = create_resource_access_chart(all_events)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
     
-    recent_table = create_recent_events_table(all_events[:10])
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
     
-    return (summary_cards, timeline_fig, severity_fig, top_attackers_fig, 
-            attack_types_fig, hourly_fig, resource_fig, recent_table)
+    return selected
+
+
+SUMMARY_CARD_STYLE = {
+    'backgroundColor': 'white',
+    'padding': '24px',
+    'borderRadius': '8px',
+    'border': '1px solid #e0e0e0',
+    'flex': '1',
+    'minWidth': '200px',
+    'transition': 'box-shadow 0.2s',
+    'boxShadow': '0 1px 2px rgba(0,0,0,0.05)'
+}
+SUMMARY_TITLE_STYLE = {'fontSize': '13px', 'color': '#666666', 'marginBottom': '8px'}
+SUMMARY_VALUE_STYLE = {'fontSize': '32px', 'fontWeight': '700', 'color': '#1a1a1a'}
+SUMMARY_ROW_STYLE = {'display': 'flex', 'alignItems': 'baseline'}
 
 
 def create_summary_card(title, value, emoji, color):
     return html.Div([
         html.Div([
-            html.Div(title, style={'fontSize': '13px', 'color': '#666666', 'marginBottom': '8px'}),
+            html.Div(title, style=SUMMARY_TITLE_STYLE),
             html.Div([
-                html.Span(str(value), style={'fontSize': '32px', 'fontWeight': '700', 'color': '#1a1a1a'})
-            ], style={'display': 'flex', 'alignItems': 'baseline'})
+                html.Span(str(value), style=SUMMARY_VALUE_STYLE)
+            ], style=SUMMARY_ROW_STYLE)
         ])
-    ], style={
-        'backgroundColor': 'white',
-        'padding': '24px',
-        'borderRadius': '8px',
-        'border': '1px solid
-        'flex': '1',
-        'minWidth': '200px',
-        'transition': 'box-shadow 0.2s',
-        'boxShadow': '0 1px 2px rgba(0,0,0,0.05)'
-    })
-
-
-def create_timeline_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(
-            title="Events Over Time",
-            annotations=[dict(text="No data available", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5, font=dict(size=14, color="
-        )
-        return fig
-    
-    from collections import defaultdict
-    
-    hourly_counts = defaultdict(int)
-    
-    for event in events:
-        timestamp = event.get('timestamp')
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp)
-    
-        if timestamp.tzinfo is not None:
-            timestamp = timestamp.replace(tzinfo=None)
-        hour_key = timestamp.replace(minute=0, second=0, microsecond=0)
-        hourly_counts[hour_key] += 1
-    
-    hours = sorted(hourly_counts.keys())
-    counts = [hourly_counts[h] for h in hours]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=hours, y=counts, 
-        mode='lines+markers',
-        line=dict(color='
-        marker=dict(size=8, color='
-        fill='tozeroy',
-        fillcolor='rgba(37, 99, 235, 0.1)'
-    ))
-    fig.update_layout(
-        title=dict(text="Events Over Time", font=dict(size=16, color="
-        xaxis_title="Time",
-        yaxis_title="Event Count",
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=60, r=30, t=60, b=60),
-        hovermode='x unified'
-    )
-    return fig
+    ], style=SUMMARY_CARD_STYLE)
+
+
+def create_timeline_chart(stats):
+    if not stats.total:
+        return {'data': [], 'layout': {
+            'title': {'text': "Events Over Time"},
+            'template': PLOTLY_WHITE,
+            'annotations': [dict(text="No data available", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5, font=dict(size=14, color="#666666"))]
+        }}
+    
+    return {
+        'data': [dict(
+            type='scattergl',
+            x=stats.timeline['x'], y=stats.timeline['y'], 
+            mode='lines+markers',
+            line=dict(color='#2563eb', width=2),
+            marker=dict(size=8, color='#2563eb'),
+            fill='tozeroy',
+            fillcolor='rgba(37, 99, 235, 0.1)'
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Events Over Time", font=TITLE_FONT),
+            'hovermode': 'x unified',
+            'xaxis': dict(title=dict(text="Time"), type='date'),
+            'yaxis': dict(title=dict(text="Event Count"), type='linear')
+        }
+    }
 
 
-def create_severity_pie_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(title="Severity Distribution")
-        return fig
+def create_severity_pie_chart(stats):
+    if not stats.total:
+        return {'data': [], 'layout': {'title': {'text': "Severity Distribution"}, 'template': PLOTLY_WHITE}}
     
-    severity_counts = {}
-    for event in events:
-        severity = event.get('severity')
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+    severity_counts = {s: count for s, count in stats.severity.items() if count > 0}
     
     colors = {'critical': '#dc3545', 'high': '#ff9800', 'medium': '#ffc107', 'low': '#28a745'}
     
-    fig = go.Figure(data=[go.Pie(
-        labels=list(severity_counts.keys()),
-        values=list(severity_counts.values()),
-        marker=dict(colors=[colors.get(s, '#6c757d') for s in severity_counts.keys()])
-        textinfo='label+percent',
-        textfont=dict(size=13),
-        hole=0.4
-    )])
-    fig.update_layout(
-        title=dict(text="Severity Distribution", font=dict(size=16, color="#1a1a1a"))
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=30, r=30, t=60, b=30),
-        showlegend=True,
-        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1)
-    )
-    return fig
+    return {
+        'data': [dict(
+            type='pie',
+            labels=list(severity_counts.keys()),
+            values=list(severity_counts.values()),
+            marker=dict(colors=[colors.get(s, '#6c757d') for s in severity_counts]),
+            textinfo='label+percent',
+            textfont=dict(size=13),
+            hole=0.4
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Severity Distribution", font=TITLE_FONT),
+            'margin': dict(l=30, r=30, t=60, b=30),
+            'showlegend': True,
+            'legend': dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1)
+        }
+    }
 
 
-def create_top_attackers_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(title="Top Attacker IPs")
-        return fig
-    
-    from collections import Counter
-    ip_counts = Counter(e.get('ip_address') for e in events if e.get('ip_address'))
-    top_ips = ip_counts.most_common(10)
-    
-    fig = go.Figure(data=[go.Bar(
-        x=[ip for ip, _ in top_ips],
-        y=[count for _, count in top_ips],
-        marker=dict(color='
-        text=[count for _, count in top_ips],
-        textposition='outside'
-    )])
-    fig.update_layout(
-        title=dict(text="Top Attacker IPs", font=dict(size=16, color="
-        xaxis_title="IP Address",
-        yaxis_title="Event Count",
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=60, r=30, t=60, b=80),
-        xaxis=dict(tickangle=-45)
-    )
-    return fig
+@cache.memoize()
+def create_top_attackers_chart(top_ips):
+    """Build the top attackers figure from (ip, count) pairs; cached per distinct input"""
+    if not top_ips:
+        return {'data': [], 'layout': {'title': {'text': "Top Attacker IPs"}, 'template': PLOTLY_WHITE}}
+    
+    ips, counts = zip(*top_ips)
+    
+    return {
+        'data': [dict(
+            type='bar',
+            x=list(ips),
+            y=list(counts),
+            marker=dict(color='#2563eb'),
+            text=list(counts),
+            textposition='outside'
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Top Attacker IPs", font=TITLE_FONT),
+            'margin': dict(l=60, r=30, t=60, b=80),
+            'xaxis': dict(title=dict(text="IP Address"), tickangle=-45, type='category'),
+            'yaxis': dict(title=dict(text="Event Count"), type='linear')
+        }
+    }
 
 
-def create_attack_types_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(title="Attack Types")
-        return fig
-    
-    from collections import Counter
-    type_counts = Counter(e.get('event_type', '').replace('_', ' ').title() for e in events)
-    
-    fig = go.Figure(data=[go.Bar(
-        x=list(type_counts.keys()),
-        y=list(type_counts.values()),
-        marker=dict(color='
-        text=list(type_counts.values()),
-        textposition='outside'
-    )])
-    fig.update_layout(
-        title=dict(text="Attack Types", font=dict(size=16, color="
-        xaxis_title="Type",
-        yaxis_title="Count",
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=60, r=30, t=60, b=80),
-        xaxis=dict(tickangle=-45)
-    )
-    return fig
+@cache.memoize()
+def create_attack_types_chart(type_counts):
+    """Build the attack types figure from (type, count) pairs; cached per distinct input"""
+    if not type_counts:
+        return {'data': [], 'layout': {'title': {'text': "Attack Types"}, 'template': PLOTLY_WHITE}}
+    
+    types, counts = zip(*type_counts)
+    
+    return {
+        'data': [dict(
+            type='bar',
+            x=list(types),
+            y=list(counts),
+            marker=dict(color='#2563eb'),
+            text=list(counts),
+            textposition='outside'
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Attack Types", font=TITLE_FONT),
+            'margin': dict(l=60, r=30, t=60, b=80),
+            'xaxis': dict(title=dict(text="Type"), tickangle=-45, type='category'),
+            'yaxis': dict(title=dict(text="Count"), type='linear')
+        }
+    }
 
 
-def create_hourly_pattern_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(title="Hourly Activity Pattern")
-        return fig
-    
-    from collections import defaultdict
-    hourly = defaultdict(int)
-    
-    for event in events:
-        timestamp = event.get('timestamp')
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp)
-
-        if timestamp.tzinfo is not None:
-            timestamp = timestamp.replace(tzinfo=None)
-        hourly[timestamp.hour] += 1
+def create_hourly_pattern_chart(stats):
+    if not stats.total:
+        return {'data': [], 'layout': {'title': {'text': "Hourly Activity Pattern"}, 'template': PLOTLY_WHITE}}
     
     hours = list(range(24))
-    counts = [hourly[h] for h in hours]
-    
-    fig = go.Figure(data=[go.Bar(
-        x=hours,
-        y=counts,
-        marker=dict(color='
-        text=counts,
-        textposition='outside'
-    )])
-    fig.update_layout(
-        title=dict(text="Hourly Activity Pattern", font=dict(size=16, color="
-        xaxis_title="Hour of Day (24h)",
-        yaxis_title="Event Count",
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=60, r=30, t=60, b=60),
-        xaxis=dict(dtick=2)
-    )
-    return fig
-
-
-def create_resource_access_chart(events):
-    if not events:
-        fig = go.Figure()
-        fig.update_layout(title="Most Accessed Resources")
-        return fig
-    
-    from collections import Counter
-    resource_counts = Counter(e.get('resource') for e in events if e.get('resource'))
-    top_resources = resource_counts.most_common(10)
-    
-    labels = [r[:40] + '...' if len(r) > 40 else r for r, _ in top_resources]
-    
-    fig = go.Figure(data=[go.Bar(
-        y=labels,
-        x=[count for _, count in top_resources],
-        orientation='h',
-        marker=dict(color='
-        text=[count for _, count in top_resources],
-        textposition='outside'
-    )])
-    fig.update_layout(
-        title=dict(text="Most Accessed Resources", font=dict(size=16, color="
-        xaxis_title="Access Count",
-        yaxis_title="Resource",
-        template="plotly_white",
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(family="-apple-system, BlinkMacSystemFont, Segoe UI, Roboto", color="
-        margin=dict(l=200, r=30, t=60, b=60),
-        height=450
-    )
-    return fig
+    counts = stats.hourly
+    
+    return {
+        'data': [dict(
+            type='bar',
+            x=hours,
+            y=counts,
+            marker=dict(color='#2563eb'),
+            text=counts,
+            textposition='outside'
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Hourly Activity Pattern", font=TITLE_FONT),
+            'xaxis': dict(title=dict(text="Hour of Day (24h)"), dtick=2, type='linear'),
+            'yaxis': dict(title=dict(text="Event Count"), type='linear')
+        }
+    }
 
 
-def create_recent_events_table(events):
-    if not events:
-        return html.Div("No recent events to display", 
-                       style={'textAlign': 'center', 'padding': '40px', 'color': '#666666'})
-    
-    severity_colors = {
-        'critical': '#dc3545',
-        'high': '#ff9800',
-        'medium': '#ffc107',
-        'low': '#28a745'
+def create_resource_access_chart(stats):
+    if not stats.total:
+        return {'data': [], 'layout': {'title': {'text': "Most Accessed Resources"}, 'template': PLOTLY_WHITE}}
+    
+    top_resources = stats.resources
+    
+    labels = [r[:40] + '...' if len(r) > 40 else r for r in top_resources]
+    
+    return {
+        'data': [dict(
+            type='bar',
+            y=labels,
+            x=list(top_resources.values()),
+            orientation='h',
+            marker=dict(color='#2563eb'),
+            text=list(top_resources.values()),
+            textposition='outside'
+        )],
+        'layout': {
+            **BASE_LAYOUT,
+            'title': dict(text="Most Accessed Resources", font=TITLE_FONT),
+            'margin': dict(l=200, r=30, t=60, b=60),
+            'height': 450,
+            'xaxis': dict(title=dict(text="Access Count"), type='linear'),
+            'yaxis': dict(title=dict(text="Resource"), type='category')
+        }
     }
-    
-    rows = []
-    for event in events:
-        timestamp = event.get('timestamp')
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp)
 
-        if timestamp.tzinfo is not None:
-            timestamp = timestamp.replace(tzinfo=None)
-        
-        event_type = event.get('event_type', 'unknown')
-        severity = event.get('severity', 'low')
-        ip_address = event.get('ip_address', 'N/A')
-        resource = event.get('resource', 'N/A')
-        
-        rows.append(html.Tr([
-            html.Td(timestamp.strftime('%Y-%m-%d %H:%M:%S'), 
-                   style={'padding': '16px', 'fontSize': '13px', 'color': '#1a1a1a'}),
-            html.Td(event_type.replace('_', ' ').title(), 
-                   style={'padding': '16px', 'fontSize': '13px', 'color': '#1a1a1a'})
-            html.Td(
-                html.Span(severity.upper(), 
-                         style={
-                             'padding': '4px 12px',
-                             'borderRadius': '12px',
-                             'fontSize': '11px',
-                             'fontWeight': '600',
-                             'color': 'white',
-                             'backgroundColor': severity_colors.get(severity, '#6c757d'),
-                             'textTransform': 'uppercase',
-                             'letterSpacing': '0.5px'
-                         }), 
-                style={'padding': '16px'}),
-            html.Td(ip_address, 
-                   style={'padding': '16px', 'fontFamily': 'monospace', 'fontSize': '13px', 'color': '#1a1a1a'}),
-            html.Td(resource[:45] + '...' if len(resource) > 45 else resource,
-                   style={'padding': '16px', 'fontSize': '12px', 'color': '#666666'})
-        ], style={'borderBottom': '1px solid #e0e0e0'})
-    
-    table = html.Table([
-        html.Thead(html.Tr([
-            html.Th('Timestamp', style={
-                'padding': '16px',
-                'textAlign': 'left',
-                'backgroundColor': '#f8f9fa',
-                'color': '#495057',
-                'fontSize': '12px',
-                'fontWeight': '600',
-                'textTransform': 'uppercase',
-                'letterSpacing': '0.5px',
-                'borderBottom': '2px solid #dee2e6'
-            }),
-            html.Th('Event Type', style={
-                'padding': '16px',
-                'textAlign': 'left',
-                'backgroundColor': '#f8f9fa',
-                'color': '#495057',
-                'fontSize': '12px',
-                'fontWeight': '600',
-                'textTransform': 'uppercase',
-                'letterSpacing': '0.5px',
-                'borderBottom': '2px solid #dee2e6'
-            }),
-            html.Th('Severity', style={
-                'padding': '16px',
-                'textAlign': 'left',
-                'backgroundColor': '#f8f9fa',
-                'color': '#495057',
-                'fontSize': '12px',
-                'fontWeight': '600',
-                'textTransform': 'uppercase',
-                'letterSpacing': '0.5px',
-                'borderBottom': '2px solid #dee2e6'
-            }),
-            html.Th('Source IP', style={
-                'padding': '16px',
-                'textAlign': 'left',
-                'backgroundColor': '#f8f9fa',
-                'color': '#495057',
-                'fontSize': '12px',
-                'fontWeight': '600',
-                'textTransform': 'uppercase',
-                'letterSpacing': '0.5px',
-                'borderBottom': '2px solid #dee2e6'
-            }),
-            html.Th('Resource', style={
-                'padding': '16px',
-                'textAlign': 'left',
-                'backgroundColor': '#f8f9fa',
-                'color': '#495057',
-                'fontSize': '12px',
-                'fontWeight': '600',
-                'textTransform': 'uppercase',
-                'letterSpacing': '0.5px',
-                'borderBottom': '2px solid #dee2e6'
-            }),
-        ])),
-        html.Tbody(rows)
-    ], style={
-        'width': '100%',
-        'borderCollapse': 'collapse',
-        'backgroundColor': 'white',
-        'border': '1px solid
+
+SEVERITY_COLORS = {
+    'critical': '#dc3545',
+    'high': '#ff9800',
+    'medium': '#ffc107',
+    'low': '#28a745'
+}
+
+
+# Invariant table config, built once at import instead of on every refresh
+RECENT_EVENTS_TABLE_CONFIG = dict(
+    columns=[
+        {'name': 'Timestamp', 'id': 'timestamp'},
+        {'name': 'Event Type', 'id': 'event_type'},
+        {'name': 'Severity', 'id': 'severity'},
+        {'name': 'Source IP', 'id': 'ip_address'},
+        {'name': 'Resource', 'id': 'resource'},
+    ],
+    page_size=10,
+    style_as_list_view=True,
+    style_table={
+        'border': '1px solid #e0e0e0',
         'borderRadius': '8px',
         'overflow': 'hidden'
-    })
+    },
+    style_header={
+        'padding': '16px',
+        'textAlign': 'left',
+        'backgroundColor': '#f8f9fa',
+        'color': '#495057',
+        'fontSize': '12px',
+        'fontWeight': '600',
+        'textTransform': 'uppercase',
+        'letterSpacing': '0.5px',
+        'borderBottom': '2px solid #dee2e6'
+    },
+    style_cell={
+        'padding': '16px',
+        'textAlign': 'left',
+        'fontSize': '13px',
+        'color': '#1a1a1a',
+        'backgroundColor': 'white',
+        'borderBottom': '1px solid #e0e0e0',
+        'fontFamily': 'inherit'
+    },
+    style_cell_conditional=[
+        {'if': {'column_id': 'ip_address'}, 'fontFamily': 'monospace'},
+        {'if': {'column_id': 'resource'}, 'fontSize': '12px', 'color': '#666666'},
+    ],
+    style_data_conditional=[
+        {
+            'if': {'column_id': 'severity', 'filter_query': f'{{severity}} eq "{severity.upper()}"'},
+            'backgroundColor': color,
+            'color': 'white',
+            'fontSize': '11px',
+            'fontWeight': '600',
+            'letterSpacing': '0.5px'
+        }
+        for severity, color in SEVERITY_COLORS.items()
+    ]
+)
+
+NO_RECENT_EVENTS_STYLE = {'textAlign': 'center', 'padding': '40px', 'color': '#666666'}
+
+
+def create_recent_events_table(rows):
+    if not rows:
+        return html.Div("No recent events to display", style=NO_RECENT_EVENTS_STYLE)
     
-    return table
+    return dash_table.DataTable(data=rows, **RECENT_EVENTS_TABLE_CONFIG)
 
 
 if __name__ == '__main__':
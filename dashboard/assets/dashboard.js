@@ -0,0 +1,28 @@
+/*
+ * Clientside callbacks for the honey token dashboard.
+ * The events store always holds the widest time range, so switching the
+ * time-range dropdown only filters in the browser instead of refetching.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        refilter: function(hours, events, n_intervals, current) {
+            if (!events) {
+                return [];
+            }
+            var cutoff = Date.now() - hours * 3600 * 1000;
+            var filtered = events.filter(function(event) {
+                return Date.parse(event.timestamp) >= cutoff;
+            });
+            // Interval ticks only age events out of the window; when none dropped
+            // out, the charts are left alone
+            var triggered = dash_clientside.callback_context.triggered.map(function(t) {
+                return t.prop_id;
+            });
+            if (triggered.length === 1 && triggered[0] === 'interval-component.n_intervals' &&
+                    current && current.length === filtered.length) {
+                return dash_clientside.no_update;
+            }
+            return filtered;
+        }
+    }
+});
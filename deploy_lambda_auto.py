@@ -4,43 +4,47 @@ Uses boto3 to deploy Lambda directly without AWS CLI
 """
 
 import boto3
+import io
 import os
 import json
 import zipfile
+from botocore.config import Config
 from dotenv import load_dotenv
 
 load_dotenv()
 
+region = os.getenv('AWS_REGION', 'us-east-1')
+account_id = os.getenv('AWS_ACCOUNT_ID')
+
+# One session and one client per service, shared by every deploy step
+session = boto3.Session(region_name=region)
+client_config = Config(retries={'mode': 'adaptive'}, max_pool_connections=20)
+lambda_client = session.client('lambda', config=client_config)
+events_client = session.client('events', config=client_config)
+
 def create_lambda_package():
-    """Create Lambda deployment ZIP"""
+    """Create Lambda deployment ZIP in memory and return its bytes"""
     print("\n Creating Lambda deployment package...")
     
-    zip_path = 'lambda_deployment.zip'
+    buffer = io.BytesIO()
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
         zipf.write('lambda_function.py')
         print(f"   Added lambda_function.py")
     
-    file_size = os.path.getsize(zip_path)
-    print(f"   Package size: {file_size / 1024:.1f} KB")
+    zip_content = buffer.getvalue()
+    print(f"   Package size: {len(zip_content) / 1024:.1f} KB")
     
-    return zip_path
+    return zip_content
 
 def deploy_lambda():
     """Deploy Lambda function"""
     print("\n Deploying Lambda function...")
     
-    region = os.getenv('AWS_REGION', 'us-east-1')
-    account_id = os.getenv('AWS_ACCOUNT_ID')
-    
-    lambda_client = boto3.client('lambda', region_name=region)
-    
     function_name = 'HoneyTokenLogMonitor'
     role_arn = f'arn:aws:iam::{account_id}:role/HoneyTokenLambdaRole'
     
-    zip_path = create_lambda_package()
-    with open(zip_path, 'rb') as f:
-        zip_content = f.read()
+    zip_content = create_lambda_package()
     
     try:
         response = lambda_client.create_function(
@@ -94,12 +98,6 @@ def create_eventbridge_rule():
     """Create EventBridge rule for automatic triggers"""
     print("\n Setting up EventBridge scheduler...")
     
-    region = os.getenv('AWS_REGION', 'us-east-1')
-    account_id = os.getenv('AWS_ACCOUNT_ID')
-    
-    events_client = boto3.client('events', region_name=region)
-    lambda_client = boto3.client('lambda', region_name=region)
-    
     rule_name = 'HoneyTokenLogAnalysis'
     function_name = 'HoneyTokenLogMonitor'
     
@@ -146,9 +144,6 @@ def test_lambda():
     """Test Lambda function"""
     print("\n Testing Lambda function...")
     
-    region = os.getenv('AWS_REGION', 'us-east-1')
-    lambda_client = boto3.client('lambda', region_name=region)
-    
     response = lambda_client.invoke(
         FunctionName='HoneyTokenLogMonitor',
         InvocationType='RequestResponse',
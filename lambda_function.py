@@ -5,14 +5,26 @@ This runs every 5 minutes to detect attacks automatically
 
 import json
 import os
+import re
+import time
 import boto3
-from datetime import datetime, timedelta
-import pytz
-from collections import defaultdict, Counter
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import islice
 import uuid
 
-@dataclass
+# orjson is not part of the Lambda runtime; it is used when bundled and json covers the rest
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@dataclass(slots=True, frozen=True)
 class SecurityEvent:
     event_type: str
     severity: str
@@ -22,14 +34,97 @@ class SecurityEvent:
     details: dict
     region: str
 
+# Parsed access log record; every field is filled at parse time so detectors read attributes directly
+LogRec = namedtuple('LogRec', 'timestamp remote_ip object_name user_agent http_status operation')
+
+# S3 server access log line: owner bucket [time] ip requester request_id operation key "uri" status ... "referer" "agent"
+S3_LOG_RE = re.compile(
+    rb'\S+ \S+ \[(?P<time>[^\]]+)\] (?P<ip>\S+) \S+ \S+ (?P<op>\S+) (?P<key>\S+) "[^"]*" '
+    rb'(?P<status>\S+) \S+ \S+ \S+ \S+ \S+ "[^"]*" "(?P<ua>[^"]*)"'
+)
+
+# Server access log objects are named YYYY-mm-DD-HH-MM-SS-UniqueString
+ACCESS_LOG_KEY_RE = re.compile(r'\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}-')
+
+SUSPICIOUS_AGENT_RE = re.compile(r'curl|wget|python|bot|crawler|scanner|script', re.IGNORECASE)
+
+FAILURE_STATUSES = frozenset({'401', '403', '404'})
+ABNORMAL_HOURS = frozenset(range(0, 6))
+
+# Created once per container so warm invocations reuse the clients and their connections
+REGION = os.environ.get('HONEY_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+S3_CLIENT = boto3.client('s3', region_name=REGION, config=Config(max_pool_connections=16))
+DYNAMODB = boto3.resource('dynamodb', region_name=REGION)
+LOGS_CLIENT = boto3.client('logs', region_name=REGION)
+
+
+def dumps_json(obj):
+    """Encode obj to a JSON string, rendering datetimes as ISO strings"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC).decode()
+    return json.dumps(obj, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+@lru_cache(maxsize=8192)
+def parse_log_time(raw_time):
+    """Convert an access log time like 06/Feb/2019:00:00:38 +0000 to ISO format"""
+    return datetime.strptime(raw_time.decode(), '%d/%b/%Y:%H:%M:%S %z').isoformat()
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(timestamp_str):
+    """Parse an ISO timestamp, memoized since log lines often share the same second"""
+    if timestamp_str.endswith('Z'):
+        return datetime.fromisoformat(timestamp_str[:-1] + '+00:00')
+    return datetime.fromisoformat(timestamp_str)
+
+
 class CloudWatchAnalyzer:
-    def __init__(self, region='us-east-1'):
+    def __init__(self, region=REGION):
         self.region = region
-        self.s3 = boto3.client('s3', region_name=region)
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
-        self.logs = boto3.client('logs', region_name=region)
+        if region == REGION:
+            self.s3, self.dynamodb, self.logs = S3_CLIENT, DYNAMODB, LOGS_CLIENT
+        else:
+            self.s3 = boto3.client('s3', region_name=region, config=Config(max_pool_connections=16))
+            self.dynamodb = boto3.resource('dynamodb', region_name=region)
+            self.logs = boto3.client('logs', region_name=region)
         self.table_name = os.environ.get('DYNAMODB_TABLE_NAME', 'honeypot_logs')
+        self.table = self.dynamodb.Table(self.table_name)
         self.bucket_name = os.environ.get('S3_BUCKET_NAME', 'honey-tokens-storage-us-east-1')
+        self.logs_prefix = os.environ.get('S3_LOGS_PREFIX', '')
+        if self.logs_prefix and not self.logs_prefix.endswith('/'):
+            self.logs_prefix += '/'
+    
+    def _read_log_file(self, logs_bucket, key):
+        """Download one access log file and parse it into log entries"""
+        logs = []
+        
+        try:
+            log_obj = self.s3.get_object(Bucket=logs_bucket, Key=key)
+            
+            # Stream the body line by line; only the captured fields are decoded
+            for raw_line in log_obj['Body'].iter_lines(chunk_size=65536):
+                if not raw_line or raw_line.startswith(b'#'):
+                    continue
+                match = S3_LOG_RE.match(raw_line)
+                if not match:
+                    continue
+                try:
+                    logs.append(LogRec(
+                        timestamp=parse_log_time(match['time']),
+                        remote_ip=match['ip'].decode(),
+                        object_name=match['key'].decode('utf-8', 'replace').split('/')[-1],
+                        user_agent=match['ua'].decode('utf-8', 'replace'),
+                        http_status=match['status'].decode(),
+                        operation=match['op'].decode()
+                    ))
+                except ValueError as parse_error:
+                    # Covers UnicodeDecodeError too; a malformed line is skipped, not the whole file
+                    print(f"Skipping malformed line in {key}: {parse_error}")
+        except (ClientError, BotoCoreError) as read_error:
+            print(f"Error reading log file {key}: {read_error}")
+        
+        return logs
     
     def query_s3_access_logs(self, hours=1):
         """Query S3 access logs (Standard approach - 15-60 min delay)"""
@@ -38,36 +133,34 @@ class CloudWatchAnalyzer:
         
         try:
             logs_bucket = f"{self.bucket_name}-logs"
-            cutoff = datetime.now(pytz.UTC) - timedelta(hours=hours)
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
             
             print(f"Checking S3 access logs bucket: {logs_bucket}")
             
-            response = self.s3.list_objects_v2(Bucket=logs_bucket, MaxKeys=100)
+            paginator = self.s3.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
+                Bucket=logs_bucket,
+                Prefix=self.logs_prefix,
+                PaginationConfig={'PageSize': 1000}
+            )
+            
+            recent_keys = [
+                obj['Key']
+                for page in pages
+                for obj in page.get('Contents', [])
+                if obj['LastModified'] > cutoff
+                and ACCESS_LOG_KEY_RE.match(obj['Key'].rsplit('/', 1)[-1])
+            ]
+            print(f"Found {len(recent_keys)} recent log files")
             
-            log_files = response.get('Contents', [])
-            print(f"Found {len(log_files)} log files")
+            if not recent_keys:
+                return logs
             
-            for obj in log_files:
-                if obj['LastModified'] > cutoff:
-                    try:
-                        log_obj = self.s3.get_object(Bucket=logs_bucket, Key=obj['Key'])
-                        log_content = log_obj['Body'].read().decode('utf-8')
-                        
-                        for line in log_content.split('\n'):
-                            if line.strip() and not line.startswith('
-                                parts = line.split()
-                                if len(parts) > 10:
-                                    logs.append({
-                                        'timestamp': datetime.now(pytz.UTC).isoformat(),
-                                        'remote_ip': parts[4] if len(parts) > 4 else 'unknown',
-                                        'object_name': parts[7].split('/')[-1] if len(parts) > 7 else 'unknown',
-                                        'user_agent': ' '.join(parts[10:]) if len(parts) > 10 else 'unknown',
-                                        'http_status': parts[8] if len(parts) > 8 else '200',
-                                        'operation': parts[5] if len(parts) > 5 else 'GET'
-                                    })
-                    except Exception as parse_error:
-                        print(f"Error parsing log file {obj['Key']}: {parse_error}")
-                        continue
+            # Downloads are network-bound, so files are fetched and parsed concurrently
+            read_log_file = partial(self._read_log_file, logs_bucket)
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                for file_logs in executor.map(read_log_file, recent_keys):
+                    logs.extend(file_logs)
             
             print(f"Parsed {len(logs)} access events from logs")
             
@@ -77,64 +170,83 @@ class CloudWatchAnalyzer:
         
         return logs
     
-    def detect_bulk_downloads(self, logs):
-        """Detect bulk download attempts (5+ files)"""
-        events = []
-        ip_downloads = defaultdict(set)
+    def _scan(self, logs):
+        """Single pass over the logs, building every detector's per-IP accumulators at once"""
+        per_ip = defaultdict(lambda: {
+            'files': [],
+            'times': [],
+            'abnormal': [],
+            'suspicious': [],
+            'failures': []
+        })
         
         for log in logs:
-            ip = log.get('remote_ip', 'unknown')
-            resource = log.get('object_name', 'unknown')
-            ip_downloads[ip].add(resource)
+            acc = per_ip[log.remote_ip]
+            acc['files'].append(log.object_name)
+            
+            timestamp = parse_timestamp(log.timestamp)
+            acc['times'].append(timestamp.timestamp())
+            if timestamp.hour in ABNORMAL_HOURS:
+                acc['abnormal'].append(log)
+            
+            if SUSPICIOUS_AGENT_RE.search(log.user_agent):
+                acc['suspicious'].append(log)
+            
+            if log.http_status in FAILURE_STATUSES:
+                acc['failures'].append(log)
         
-        for ip, files in ip_downloads.items():
+        return per_ip
+    
+    def detect_bulk_downloads(self, per_ip, now):
+        """Detect bulk download attempts (5+ files)"""
+        events = []
+        
+        for ip, acc in per_ip.items():
+            # Fewer than 5 accesses can never be 5 distinct files, so skip building the set
+            if len(acc['files']) < 5:
+                continue
+            
+            files = set(acc['files'])
             if len(files) >= 5:
                 event = SecurityEvent(
                     event_type='bulk_download',
                     severity='critical',
-                    timestamp=datetime.now(pytz.UTC),
+                    timestamp=now,
                     ip_address=ip,
                     resource=f"{len(files)} files",
-                    details={'files': list(files)[:10], 'total': len(files)},
+                    details={'files': list(islice(files, 10)), 'total': len(files)},
                     region=self.region
                 )
                 events.append(event)
         
         return events
     
-    def detect_rapid_access(self, logs):
+    def detect_rapid_access(self, per_ip, now):
         """Detect rapid successive access (10+ accesses in 5 minutes)"""
         events = []
-        ip_access_times = defaultdict(list)
-        
-        for log in logs:
-            try:
-                timestamp_str = log.get('timestamp', '')
-                if timestamp_str:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    ip_access_times[log.get('remote_ip')].append(timestamp)
-            except:
-                continue
         
-        for ip, times in ip_access_times.items():
+        for ip, acc in per_ip.items():
+            times = acc['times']
             times.sort()
             
-            for i in range(len(times) - 9):
-                window_start = times[i]
-                window_end = times[i + 9]
+            # Sliding window over sorted epoch seconds: shrink from the left until it spans <= 5 minutes
+            left = 0
+            for right in range(len(times)):
+                while times[right] - times[left] > 300:
+                    left += 1
                 
-                if (window_end - window_start).total_seconds() <= 300:
+                if right - left + 1 >= 10:
                     event = SecurityEvent(
                         event_type='rapid_access',
                         severity='high',
-                        timestamp=datetime.now(pytz.UTC),
+                        timestamp=now,
                         ip_address=ip,
                         resource='multiple',
                         details={
-                            'access_count': 10,
+                            'access_count': right - left + 1,
                             'time_window': '5 minutes',
-                            'first_access': window_start.isoformat(),
-                            'last_access': window_end.isoformat()
+                            'first_access': datetime.fromtimestamp(times[left], timezone.utc).isoformat(),
+                            'last_access': datetime.fromtimestamp(times[right], timezone.utc).isoformat()
                         },
                         region=self.region
                     )
@@ -143,35 +255,23 @@ class CloudWatchAnalyzer:
         
         return events
     
-    def detect_abnormal_hours(self, logs):
+    def detect_abnormal_hours(self, per_ip, now):
         """Detect access during off-hours (midnight to 6 AM)"""
         events = []
-        abnormal_hours = range(0, 6)
-        ip_abnormal_access = defaultdict(list)
-        
-        for log in logs:
-            try:
-                timestamp_str = log.get('timestamp', '')
-                if timestamp_str:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    if timestamp.hour in abnormal_hours:
-                        ip = log.get('remote_ip')
-                        ip_abnormal_access[ip].append(log)
-            except:
-                continue
         
-        for ip, access_logs in ip_abnormal_access.items():
+        for ip, acc in per_ip.items():
+            access_logs = acc['abnormal']
             if len(access_logs) >= 3:
                 event = SecurityEvent(
                     event_type='abnormal_hours_access',
                     severity='medium',
-                    timestamp=datetime.now(pytz.UTC),
+                    timestamp=now,
                     ip_address=ip,
                     resource='multiple',
                     details={
                         'access_count': len(access_logs),
                         'time_range': '00:00-06:00 UTC',
-                        'files_accessed': [log.get('object_name', 'unknown') for log in access_logs[:5]]
+                        'files_accessed': [log.object_name for log in access_logs[:5]]
                     },
                     region=self.region
                 )
@@ -179,27 +279,23 @@ class CloudWatchAnalyzer:
         
         return events
     
-    def detect_suspicious_user_agents(self, logs):
+    def detect_suspicious_user_agents(self, per_ip, now):
         """Detect automated tools and suspicious user agents"""
         events = []
-        suspicious_patterns = ['curl', 'wget', 'python', 'bot', 'crawler', 'scanner', 'script']
-        ip_suspicious = defaultdict(list)
-        
-        for log in logs:
-            user_agent = log.get('user_agent', '').lower()
-            if any(pattern in user_agent for pattern in suspicious_patterns):
-                ip = log.get('remote_ip')
-                ip_suspicious[ip].append(log)
         
-        for ip, sus_logs in ip_suspicious.items():
+        for ip, acc in per_ip.items():
+            sus_logs = acc['suspicious']
+            if not sus_logs:
+                continue
+            
             event = SecurityEvent(
                 event_type='suspicious_user_agent',
                 severity='medium',
-                timestamp=datetime.now(pytz.UTC),
+                timestamp=now,
                 ip_address=ip,
                 resource=f"{len(sus_logs)} requests",
                 details={
-                    'user_agent': sus_logs[0].get('user_agent', 'Unknown'),
+                    'user_agent': sus_logs[0].user_agent,
                     'request_count': len(sus_logs),
                     'reason': 'Automated tool detected'
                 },
@@ -209,29 +305,23 @@ class CloudWatchAnalyzer:
         
         return events
     
-    def detect_failed_access_attempts(self, logs):
+    def detect_failed_access_attempts(self, per_ip, now):
         """Detect multiple failed access attempts (403/404 errors)"""
         events = []
-        ip_failures = defaultdict(list)
         
-        for log in logs:
-            status = log.get('http_status', '200')
-            if status in ['403', '404', '401']:
-                ip = log.get('remote_ip')
-                ip_failures[ip].append(log)
-        
-        for ip, failure_logs in ip_failures.items():
+        for ip, acc in per_ip.items():
+            failure_logs = acc['failures']
             if len(failure_logs) >= 5:
                 event = SecurityEvent(
                     event_type='failed_access_attempts',
                     severity='high',
-                    timestamp=datetime.now(pytz.UTC),
+                    timestamp=now,
                     ip_address=ip,
                     resource='multiple',
                     details={
                         'failure_count': len(failure_logs),
-                        'status_codes': [log.get('http_status') for log in failure_logs[:10]],
-                        'attempted_resources': [log.get('object_name', 'unknown') for log in failure_logs[:5]]
+                        'status_codes': [log.http_status for log in failure_logs[:10]],
+                        'attempted_resources': [log.object_name for log in failure_logs[:5]]
                     },
                     region=self.region
                 )
@@ -239,27 +329,44 @@ class CloudWatchAnalyzer:
         
         return events
     
-    def store_event_in_dynamodb(self, event):
-        """Store security event in DynamoDB"""
-        try:
-            table = self.dynamodb.Table(self.table_name)
-            
-            item = {
-                'event_id': f"{event.event_type}_{datetime.now().timestamp()}_{event.ip_address}",
-                'timestamp': event.timestamp.isoformat(),
-                'event_type': event.event_type,
-                'severity': event.severity,
-                'ip_address': event.ip_address,
-                'resource': event.resource,
-                'region': event.region,
-                'details': json.dumps(event.details)
-            }
-            
-            table.put_item(Item=item)
-            return True
-        except Exception as e:
-            print(f"Error storing event: {e}")
-            return False
+    def build_event_item(self, event, timestamp_iso=None):
+        """Serialize a security event into a DynamoDB item"""
+        return {
+            'event_id': f"{event.event_type}_{time.time_ns()}_{event.ip_address}_{uuid.uuid4().hex[:6]}",
+            'timestamp': timestamp_iso or event.timestamp.isoformat(),
+            'event_date': event.timestamp.strftime('%Y-%m-%d'),
+            'event_type': event.event_type,
+            'severity': event.severity,
+            'ip_address': event.ip_address,
+            'resource': event.resource,
+            'region': event.region,
+            'details': event.details
+        }
+    
+    def store_events_in_dynamodb(self, events, timestamp_iso=None, max_attempts=5):
+        """Store security events in DynamoDB with batched writes (25 items per request)"""
+        items = [self.build_event_item(event, timestamp_iso) for event in events]
+        if not items:
+            return 0
+        
+        for attempt in range(max_attempts):
+            try:
+                with self.table.batch_writer(overwrite_by_pkeys=['event_id']) as batch:
+                    for item in items:
+                        batch.put_item(Item=item)
+                return len(items)
+            except ClientError as e:
+                code = e.response['Error']['Code']
+                if code not in ('ProvisionedThroughputExceededException', 'ThrottlingException'):
+                    print(f"Error storing events: {e}")
+                    return 0
+                time.sleep(min(2 ** attempt * 0.05, 1.0))
+            except Exception as e:
+                print(f"Error storing events: {e}")
+                return 0
+        
+        print(f"Error storing events: still throttled after {max_attempts} attempts")
+        return 0
     
     def analyze_logs(self, hours=1):
         """Analyze logs for attacks - ALL DETECTION PATTERNS"""
@@ -273,20 +380,28 @@ class CloudWatchAnalyzer:
         
         print(f"Found {len(logs)} log entries to analyze")
         
+        per_ip = self._scan(logs)
+        now = datetime.now(timezone.utc)
+        
         all_events = {
-            'bulk_download': self.detect_bulk_downloads(logs),
-            'rapid_access': self.detect_rapid_access(logs),
-            'abnormal_hours': self.detect_abnormal_hours(logs),
-            'suspicious_user_agent': self.detect_suspicious_user_agents(logs),
-            'failed_access_attempts': self.detect_failed_access_attempts(logs)
+            'bulk_download': self.detect_bulk_downloads(per_ip, now),
+            'rapid_access': self.detect_rapid_access(per_ip, now),
+            'abnormal_hours': self.detect_abnormal_hours(per_ip, now),
+            'suspicious_user_agent': self.detect_suspicious_user_agents(per_ip, now),
+            'failed_access_attempts': self.detect_failed_access_attempts(per_ip, now)
         }
         
-        total_stored = 0
         for event_type, events in all_events.items():
             print(f"  {event_type}: {len(events)} events")
-            for event in events:
-                if self.store_event_in_dynamodb(event):
-                    total_stored += 1
+        
+        if not any(all_events.values()):
+            return all_events
+        
+        # Every event carries the same detection time, so it is formatted once
+        total_stored = self.store_events_in_dynamodb(
+            [event for events in all_events.values() for event in events],
+            timestamp_iso=now.isoformat()
+        )
         
         print(f"Total events stored: {total_stored}")
         
@@ -299,13 +414,11 @@ def lambda_handler(event, context):
     This is the REAL AWS-native detection!
     """
     
-    print(f" Lambda Function Started: {datetime.utcnow().isoformat()}")
-    print(f"Event: {json.dumps(event)}")
-    
-    region = os.environ.get('HONEY_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+    print(f" Lambda Function Started: {datetime.now(timezone.utc).isoformat()}")
+    print(f"Event: {dumps_json(event)}")
     
     try:
-        analyzer = CloudWatchAnalyzer(region=region)
+        analyzer = CloudWatchAnalyzer(region=REGION)
         
         events = analyzer.analyze_logs(hours=1)
         
@@ -318,10 +431,10 @@ def lambda_handler(event, context):
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': dumps_json({
                 'message': 'Log analysis completed',
                 'events_detected': total_events,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': datetime.now(timezone.utc).isoformat()
             })
         }
         
@@ -332,9 +445,9 @@ def lambda_handler(event, context):
         
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': dumps_json({
                 'error': str(e),
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': datetime.now(timezone.utc).isoformat()
             })
         }
 
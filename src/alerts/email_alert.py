@@ -3,102 +3,69 @@ Email Alert System
 Sends security alerts via email using SendGrid
 """
 
+import logging
 import os
+from string import Template
 from typing import List
 from datetime import datetime
-from sendgrid import SendGridAPIClient
+import requests
+from requests.adapters import HTTPAdapter
 from sendgrid.helpers.mail import Mail, Email, To, Content
 from src.analysis import SecurityEvent
 
 
-class EmailAlertSystem:
-    """Send email alerts for security events"""
-    
-    def __init__(self, api_key: str = None, from_email: str = None, to_email: str = None):
-        """
-        Initialize Email Alert System
-        
-        Args:
-            api_key: SendGrid API key
-            from_email: Sender email address
-            to_email: Recipient email address
-        """
-        self.api_key = api_key or os.getenv('SENDGRID_API_KEY')
-        self.from_email = from_email or os.getenv('ALERT_EMAIL', 'security@company.com')
-        self.to_email = to_email or os.getenv('ALERT_EMAIL')
-        
-        if not self.api_key:
-            print("️  SendGrid API key not configured")
-            self.enabled = False
-        else:
-            self.sg = SendGridAPIClient(self.api_key)
-            self.enabled = True
-    
-    def format_event_html(self, event: SecurityEvent) -> str:
-        """
-        Format security event as HTML
-        
-        Args:
-            event: Security event
-            
-        Returns:
-            HTML string
-        """
-        severity_colors = {
-            'critical': '#dc3545',
-            'high': '#ff9800',
-            'medium': '#ffc107',
-            'low': '#28a745'
-        }
-        
-        color = severity_colors.get(event.severity, '#6c757d')
-        
-        html = f"""
+logger = logging.getLogger(__name__)
+
+SENDGRID_SEND_URL = 'https://api.sendgrid.com/v3/mail/send'
+
+SEVERITY_COLORS = {
+    'critical': '#dc3545',
+    'high': '#ff9800',
+    'medium': '#ffc107',
+    'low': '#28a745'
+}
+
+EVENT_TEMPLATE = Template("""
         <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-            <div style="background-color: {color}; color: white; padding: 20px; border-radius: 5px 5px 0 0;">
-                <h2 style="margin: 0;"> Security Alert: {event.event_type.replace('_', ' ').title()}</h2>
+            <div style="background-color: $color; color: white; padding: 20px; border-radius: 5px 5px 0 0;">
+                <h2 style="margin: 0;"> Security Alert: $title</h2>
             </div>
-            <div style="border: 1px solid
+            <div style="border: 1px solid #dddddd; border-top: none; padding: 20px; border-radius: 0 0 5px 5px;">
                 <table style="width: 100%; border-collapse: collapse;">
                     <tr>
                         <td style="padding: 10px; font-weight: bold; width: 150px;">Severity:</td>
-                        <td style="padding: 10px; color: {color}; font-weight: bold; text-transform: uppercase;">
-                            {event.severity}
+                        <td style="padding: 10px; color: $color; font-weight: bold; text-transform: uppercase;">
+                            $severity
                         </td>
                     </tr>
-                    <tr style="background-color:
+                    <tr style="background-color: #f8f9fa;">
                         <td style="padding: 10px; font-weight: bold;">Timestamp:</td>
-                        <td style="padding: 10px;">{event.timestamp}</td>
+                        <td style="padding: 10px;">$timestamp</td>
                     </tr>
                     <tr>
                         <td style="padding: 10px; font-weight: bold;">Source IP:</td>
-                        <td style="padding: 10px; font-family: monospace;">{event.source_ip}</td>
+                        <td style="padding: 10px; font-family: monospace;">$source_ip</td>
                     </tr>
-                    <tr style="background-color:
+                    <tr style="background-color: #f8f9fa;">
                         <td style="padding: 10px; font-weight: bold;">User Agent:</td>
-                        <td style="padding: 10px; font-size: 12px;">{event.user_agent}</td>
+                        <td style="padding: 10px; font-size: 12px;">$user_agent</td>
                     </tr>
                     <tr>
                         <td style="padding: 10px; font-weight: bold;">Resource:</td>
-                        <td style="padding: 10px; font-family: monospace; font-size: 12px;">{event.resource}</td>
+                        <td style="padding: 10px; font-family: monospace; font-size: 12px;">$resource</td>
                     </tr>
-                    <tr style="background-color:
+                    <tr style="background-color: #f8f9fa;">
                         <td style="padding: 10px; font-weight: bold;">Region:</td>
-                        <td style="padding: 10px;">{event.region}</td>
+                        <td style="padding: 10px;">$region</td>
                     </tr>
                 </table>
                 
-                <h3 style="margin-top: 20px; color:
-                <div style="background-color:
-        """
-        
-        for key, value in event.details.items():
-            html += f"<div><strong>{key.replace('_', ' ').title()}:</strong> {value}</div>"
-        
-        html += """
+                <h3 style="margin-top: 20px; color: #333333;">Details</h3>
+                <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px;">
+                    $details_rows
                 </div>
                 
-                <div style="margin-top: 20px; padding: 15px; background-color:
+                <div style="margin-top: 20px; padding: 15px; background-color: #fff3cd; border-radius: 5px;">
                     <strong>️ Recommended Actions:</strong>
                     <ul style="margin: 10px 0 0 0; padding-left: 20px;">
                         <li>Review the source IP and block if necessary</li>
@@ -108,16 +75,72 @@ class EmailAlertSystem:
                     </ul>
                 </div>
                 
-                <p style="margin-top: 20px; color:
+                <p style="margin-top: 20px; color: #666666; font-size: 12px;">
                     This is an automated alert from the Cloud Honey Tokens Attribution System.
                     <br>
-                    Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}
+                    Time: $generated
                 </p>
             </div>
         </div>
+        """)
+
+
+class EmailAlertSystem:
+    """Send email alerts for security events"""
+    
+    def __init__(self, api_key: str = None, from_email: str = None, to_email: str = None):
+        """
+        Initialize Email Alert System
+        
+        Args:
+            api_key: SendGrid API key
+            from_email: Sender email address
+            to_email: Recipient email address
+        """
+        self.api_key = api_key or os.getenv('SENDGRID_API_KEY')
+        self.from_email = from_email or os.getenv('ALERT_EMAIL', 'security@company.com')
+        self.to_email = to_email or os.getenv('ALERT_EMAIL')
+        
+        if not self.api_key:
+            logger.warning('SendGrid API key not configured')
+            self.enabled = False
+        else:
+            # One keep-alive session so consecutive alerts reuse the TLS connection
+            self.session = requests.Session()
+            self.session.headers.update({
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            })
+            self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+            self.enabled = True
+    
+    def format_event_html(self, event: SecurityEvent) -> str:
+        """
+        Format security event as HTML
+        
+        Args:
+            event: Security event
+            
+        Returns:
+            HTML string
         """
+        details_rows = ''.join(
+            f"<div><strong>{key.replace('_', ' ').title()}:</strong> {value}</div>"
+            for key, value in event.details.items()
+        )
         
-        return html
+        return EVENT_TEMPLATE.substitute(
+            color=SEVERITY_COLORS.get(event.severity, '#6c757d'),
+            title=event.event_type.replace('_', ' ').title(),
+            severity=event.severity,
+            timestamp=event.timestamp,
+            source_ip=event.ip_address,
+            user_agent=event.details.get('user_agent', 'N/A'),
+            resource=event.resource,
+            region=event.region,
+            details_rows=details_rows,
+            generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+        )
     
     def send_alert(self, event: SecurityEvent) -> bool:
         """
@@ -130,7 +153,7 @@ class EmailAlertSystem:
             True if sent successfully
         """
         if not self.enabled:
-            print(f"️  Email not configured, skipping alert for {event.event_type}")
+            logger.warning('Email not configured, skipping alert for %s', event.event_type)
             return False
         
         try:
@@ -143,17 +166,17 @@ class EmailAlertSystem:
                 html_content=self.format_event_html(event)
             )
             
-            response = self.sg.send(message)
+            response = self.session.post(SENDGRID_SEND_URL, json=message.get(), timeout=5)
             
             if response.status_code == 202:
-                print(f" Email alert sent for {event.event_type} (IP: {event.source_ip})")
+                logger.info('Email alert sent for %s (IP: %s)', event.event_type, event.ip_address)
                 return True
             else:
-                print(f" Failed to send email: {response.status_code}")
+                logger.error('Failed to send email: %s', response.status_code)
                 return False
                 
         except Exception as e:
-            print(f" Error sending email alert: {e}")
+            logger.error('Error sending email alert: %s', e)
             return False
     
     def send_batch_alert(self, events: List[SecurityEvent]) -> bool:
@@ -196,7 +219,7 @@ class EmailAlertSystem:
             summary_html += f"""
             <div style="border-left: 3px solid
                 <strong>{event.event_type.replace('_', ' ').title()}</strong><br>
-                <small>IP: {event.source_ip} | Time: {event.timestamp}</small>
+                <small>IP: {event.ip_address} | Time: {event.timestamp}</small>
             </div>
             """
         
@@ -219,33 +242,34 @@ class EmailAlertSystem:
                 html_content=summary_html
             )
             
-            response = self.sg.send(message)
+            response = self.session.post(SENDGRID_SEND_URL, json=message.get(), timeout=5)
             
             if response.status_code == 202:
-                print(f" Batch email alert sent ({len(events)} events)")
+                logger.info('Batch email alert sent (%d events)', len(events))
                 return True
             else:
-                print(f" Failed to send batch email: {response.status_code}")
+                logger.error('Failed to send batch email: %s', response.status_code)
                 return False
                 
         except Exception as e:
-            print(f" Error sending batch email alert: {e}")
+            logger.error('Error sending batch email alert: %s', e)
             return False
 
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     test_event = SecurityEvent(
         timestamp=datetime.now(),
         event_type="bulk_download",
         severity="high",
-        source_ip="192.168.1.100",
-        user_agent="curl/7.68.0",
+        ip_address="192.168.1.100",
         resource="2025_financials_Q3.csv",
-        region="us-central1",
+        region="us-east-1",
         details={
+            'user_agent': "curl/7.68.0",
             'download_count': 1500,
             'unique_resources': 25,
             'time_span': 300
@@ -3,31 +3,165 @@ Slack Alert System
 Sends security alerts to Slack channels
 """
 
+import gzip
+import logging
 import os
-import json
-from typing import List, Dict
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Dict, Optional
 from datetime import datetime
+from functools import lru_cache
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src.analysis import SecurityEvent
 
 
+logger = logging.getLogger(__name__)
+
+SEVERITY_COLORS = {
+    'critical': 'danger',
+    'high': 'warning',
+    'medium': '#ffc107',
+    'low': 'good'
+}
+
+SEVERITY_EMOJIS = {
+    'critical': ':rotating_light:',
+    'high': ':warning:',
+    'medium': ':large_orange_diamond:',
+    'low': ':information_source:'
+}
+
+# (title, value format, short) for the fixed fields of a single-event alert
+EVENT_FIELDS = (
+    ("Severity", "{emoji} *{severity}*", True),
+    ("Event Type", "{event_type}", True),
+    ("Source IP", "`{ip_address}`", True),
+    ("Region", "{region}", True),
+    ("Timestamp", "{timestamp}", False),
+    ("Resource", "`{resource}`", False),
+    ("User Agent", "`{user_agent}`", False)
+)
+
+
+@lru_cache(maxsize=512)
+def _prettify(name: str) -> str:
+    """Turn an identifier like bulk_download into a title like Bulk Download"""
+    return name.replace('_', ' ').title()
+
+
 class SlackAlertSystem:
     """Send Slack alerts for security events"""
     
-    def __init__(self, webhook_url: str = None):
+    # Shared by every instance so dedup and backoff carry over between monitoring cycles
+    _sent_alerts = OrderedDict()
+    _state_lock = threading.Lock()
+    _consecutive_failures = 0
+    _circuit_open_until = 0.0
+    
+    SENT_ALERT_CACHE_SIZE = 1024
+    CIRCUIT_FAILURE_LIMIT = 3
+    CIRCUIT_OPEN_SECONDS = 30
+    
+    def __init__(self, webhook_url: str = None, batch_alerts: bool = None):
         """
         Initialize Slack Alert System
         
         Args:
             webhook_url: Slack webhook URL
+            batch_alerts: Coalesce individual alerts into batch posts
         """
         self.webhook_url = webhook_url or os.getenv('SLACK_WEBHOOK_URL')
+        if batch_alerts is None:
+            batch_alerts = os.getenv('SLACK_BATCH_ALERTS', 'false').lower() == 'true'
+        self.batch_size = int(os.getenv('SLACK_BATCH_SIZE', 10))
+        self.batch_interval = float(os.getenv('SLACK_BATCH_INTERVAL', 0.5))
+        # Off by default: gzip request bodies are only worth it for endpoints known to accept them
+        self.gzip_payloads = os.getenv('SLACK_GZIP_PAYLOADS', 'false').lower() == 'true'
+        self.dedup_seconds = float(os.getenv('SLACK_DEDUP_SECONDS', 60))
         
         if not self.webhook_url:
-            print("️  Slack webhook URL not configured")
+            logger.warning('Slack webhook URL not configured')
             self.enabled = False
         else:
+            # One keep-alive session so consecutive alerts reuse the TLS connection;
+            # only throttled or failed webhook calls (which Slack did not accept) are retried.
+            # Read errors are not: the post may already have been delivered, and a resend would duplicate it
+            retry = Retry(
+                total=2,
+                read=0,
+                other=0,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({'POST'}),
+                raise_on_status=False
+            )
+            self.session = requests.Session()
+            self.session.headers.update({'Content-Type': 'application/json'})
+            self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
             self.enabled = True
+        
+        self.batch_alerts = self.enabled and batch_alerts
+        if self.batch_alerts:
+            # Queued alerts are drained every batch_interval seconds, or as soon as batch_size are waiting
+            self._queue = deque()
+            # flush() runs on both the batcher and caller threads; the lock keeps their drains apart
+            self._drain_lock = threading.Lock()
+            self._wakeup = threading.Event()
+            self._stopping = False
+            self._worker = threading.Thread(target=self._drain_loop, name='slack-alert-batcher', daemon=True)
+            self._worker.start()
+    
+    def _drain_loop(self):
+        """Background loop that posts queued alerts until the system is closed"""
+        while not self._stopping:
+            self._wakeup.wait(self.batch_interval)
+            self._wakeup.clear()
+            self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Post every queued alert now
+        
+        Returns:
+            True if all queued alerts were sent
+        """
+        if not self.batch_alerts:
+            return True
+        
+        sent = True
+        while True:
+            with self._drain_lock:
+                events = []
+                while self._queue and len(events) < self.batch_size:
+                    events.append(self._queue.popleft())
+            if not events:
+                break
+            if len(events) == 1:
+                sent = self._post_alert(events[0]) and sent
+            else:
+                sent = self.send_batch_alert(events) and sent
+        return sent
+    
+    def close(self):
+        """Send any queued alerts and close the pooled webhook connections"""
+        if not self.enabled:
+            return
+        if self.batch_alerts:
+            self._stopping = True
+            self._wakeup.set()
+            self._worker.join()
+            self.flush()
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def format_event_slack(self, event: SecurityEvent) -> Dict:
         """
@@ -39,64 +173,31 @@ class SlackAlertSystem:
         Returns:
             Slack message payload
         """
-        severity_colors = {
-            'critical': 'danger',
-            'high': 'warning',
-            'medium': '#ffc107',
-            'low': 'good'
-        }
+        event_title = _prettify(event.event_type)
+        user_agent = str(event.details.get('user_agent', 'N/A'))
         
-        severity_emojis = {
-            'critical': ':rotating_light:',
-            'high': ':warning:',
-            'medium': ':large_orange_diamond:',
-            'low': ':information_source:'
+        values = {
+            'emoji': SEVERITY_EMOJIS.get(event.severity, ':bell:'),
+            'severity': event.severity.upper(),
+            'event_type': event_title,
+            'ip_address': event.ip_address,
+            'region': event.region,
+            'timestamp': event.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            'resource': event.resource,
+            'user_agent': f"{user_agent[:100]}..." if len(user_agent) > 100 else user_agent
         }
         
-        color = severity_colors.get(event.severity, '#6c757d')
-        emoji = severity_emojis.get(event.severity, ':bell:')
-        
         fields = [
-            {
-                "title": "Severity",
-                "value": f"{emoji} *{event.severity.upper()}*",
-                "short": True
-            },
-            {
-                "title": "Event Type",
-                "value": event.event_type.replace('_', ' ').title(),
-                "short": True
-            },
-            {
-                "title": "Source IP",
-                "value": f"`{event.source_ip}`",
-                "short": True
-            },
-            {
-                "title": "Region",
-                "value": event.region,
-                "short": True
-            },
-            {
-                "title": "Timestamp",
-                "value": event.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                "short": False
-            },
-            {
-                "title": "Resource",
-                "value": f"`{event.resource}`",
-                "short": False
-            },
-            {
-                "title": "User Agent",
-                "value": f"`{event.user_agent[:100]}...`" if len(event.user_agent) > 100 else f"`{event.user_agent}`",
-                "short": False
-            }
+            {"title": title, "value": value_format.format(**values), "short": short}
+            for title, value_format, short in EVENT_FIELDS
         ]
         
         for key, value in event.details.items():
+            # The user agent already has its own truncated field above
+            if key == 'user_agent':
+                continue
             fields.append({
-                "title": key.replace('_', ' ').title(),
+                "title": _prettify(key),
                 "value": str(value),
                 "short": True
             })
@@ -104,8 +205,8 @@ class SlackAlertSystem:
         payload = {
             "attachments": [
                 {
-                    "color": color,
-                    "title": f" Security Alert: {event.event_type.replace('_', ' ').title()}",
+                    "color": SEVERITY_COLORS.get(event.severity, '#6c757d'),
+                    "title": f" Security Alert: {event_title}",
                     "fields": fields,
                     "footer": "Cloud Honey Tokens Attribution System",
                     "footer_icon": "https://platform.slack-edge.com/img/default_application_icon.png",
@@ -127,29 +228,91 @@ class SlackAlertSystem:
             True if sent successfully
         """
         if not self.enabled:
-            print(f"️  Slack not configured, skipping alert for {event.event_type}")
+            logger.warning('Slack not configured, skipping alert for %s', event.event_type)
+            return False
+        
+        if self.batch_alerts:
+            self._queue.append(event)
+            if len(self._queue) >= self.batch_size:
+                self._wakeup.set()
+            return True
+        
+        return self._post_alert(event)
+    
+    def _post_alert(self, event: SecurityEvent) -> bool:
+        """Post a single event to the webhook"""
+        key = (self.webhook_url, event.event_type, event.ip_address, event.resource)
+        with self._state_lock:
+            sent_at = self._sent_alerts.get(key)
+        if sent_at is not None and time.monotonic() - sent_at < self.dedup_seconds:
+            logger.info('Slack alert for %s (IP: %s) already sent, skipping', event.event_type, event.ip_address)
+            return True
+        
+        if self._circuit_open():
+            logger.warning('Slack webhook failing, skipping alert for %s', event.event_type)
             return False
         
         try:
             payload = self.format_event_slack(event)
             
-            response = requests.post(
-                self.webhook_url,
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'}
-            )
+            response = self._post_payload(payload)
             
             if response.status_code == 200:
-                print(f" Slack alert sent for {event.event_type} (IP: {event.source_ip})")
+                self._remember_sent(key)
+                logger.info('Slack alert sent for %s (IP: %s)', event.event_type, event.ip_address)
                 return True
             else:
-                print(f" Failed to send Slack alert: {response.status_code}")
+                logger.error('Failed to send Slack alert: %s', response.status_code)
                 return False
                 
         except Exception as e:
-            print(f" Error sending Slack alert: {e}")
+            logger.error('Error sending Slack alert: %s', e)
             return False
     
+    def _post_payload(self, payload: Dict) -> requests.Response:
+        """POST a payload to the webhook, gzipping large bodies when enabled"""
+        body = orjson.dumps(payload)
+        try:
+            if self.gzip_payloads and len(body) > 1024:
+                response = self.session.post(
+                    self.webhook_url,
+                    data=gzip.compress(body, compresslevel=1),
+                    headers={'Content-Encoding': 'gzip'},
+                    timeout=(2, 5)
+                )
+            else:
+                response = self.session.post(self.webhook_url, data=body, timeout=(2, 5))
+        except requests.RequestException:
+            # Timeouts and connection errors count toward the breaker like 429/5xx responses
+            self._record_outcome(None)
+            raise
+        
+        self._record_outcome(response.status_code)
+        return response
+    
+    def _circuit_open(self) -> bool:
+        """Whether posts are paused after repeated throttling or server errors"""
+        return time.monotonic() < SlackAlertSystem._circuit_open_until
+    
+    def _record_outcome(self, status_code: Optional[int]):
+        """Track consecutive 429/5xx responses or failed requests (None) and trip the breaker"""
+        with self._state_lock:
+            if status_code is not None and status_code != 429 and status_code < 500:
+                SlackAlertSystem._consecutive_failures = 0
+                return
+            SlackAlertSystem._consecutive_failures += 1
+            if SlackAlertSystem._consecutive_failures >= self.CIRCUIT_FAILURE_LIMIT:
+                SlackAlertSystem._circuit_open_until = time.monotonic() + self.CIRCUIT_OPEN_SECONDS
+                SlackAlertSystem._consecutive_failures = 0
+    
+    def _remember_sent(self, key):
+        """Record a delivered alert in the bounded LRU of recent sends"""
+        with self._state_lock:
+            self._sent_alerts[key] = time.monotonic()
+            self._sent_alerts.move_to_end(key)
+            if len(self._sent_alerts) > self.SENT_ALERT_CACHE_SIZE:
+                self._sent_alerts.popitem(last=False)
+    
     def send_batch_alert(self, events: List[SecurityEvent]) -> bool:
         """
         Send a batch alert for multiple events
@@ -163,6 +326,10 @@ class SlackAlertSystem:
         if not self.enabled or not events:
             return False
         
+        if self._circuit_open():
+            logger.warning('Slack webhook failing, skipping batch alert (%d events)', len(events))
+            return False
+        
         severity_counts = {}
         for event in events:
             severity_counts[event.severity] = severity_counts.get(event.severity, 0) + 1
@@ -173,30 +340,17 @@ class SlackAlertSystem:
         for severity in ['critical', 'high', 'medium', 'low']:
             if severity in severity_counts:
                 count = severity_counts[severity]
-                emoji = {
-                    'critical': ':rotating_light:',
-                    'high': ':warning:',
-                    'medium': ':large_orange_diamond:',
-                    'low': ':information_source:'
-                }.get(severity, ':bell:')
-                summary_text += f"{emoji} {severity.upper()}: {count}\n"
+                summary_text += f"{SEVERITY_EMOJIS[severity]} {severity.upper()}: {count}\n"
         
         attachments = []
         for event in events[:10]:
-            severity_color = {
-                'critical': 'danger',
-                'high': 'warning',
-                'medium': '#ffc107',
-                'low': 'good'
-            }.get(event.severity, '#6c757d')
-            
             attachments.append({
-                "color": severity_color,
-                "title": event.event_type.replace('_', ' ').title(),
+                "color": SEVERITY_COLORS.get(event.severity, '#6c757d'),
+                "title": _prettify(event.event_type),
                 "fields": [
                     {
                         "title": "IP",
-                        "value": event.source_ip,
+                        "value": event.ip_address,
                         "short": True
                     },
                     {
@@ -216,37 +370,34 @@ class SlackAlertSystem:
         }
         
         try:
-            response = requests.post(
-                self.webhook_url,
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'}
-            )
+            response = self._post_payload(payload)
             
             if response.status_code == 200:
-                print(f" Batch Slack alert sent ({len(events)} events)")
+                logger.info('Batch Slack alert sent (%d events)', len(events))
                 return True
             else:
-                print(f" Failed to send batch Slack alert: {response.status_code}")
+                logger.error('Failed to send batch Slack alert: %s', response.status_code)
                 return False
                 
         except Exception as e:
-            print(f" Error sending batch Slack alert: {e}")
+            logger.error('Error sending batch Slack alert: %s', e)
             return False
 
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     test_event = SecurityEvent(
         timestamp=datetime.now(),
         event_type="rapid_access",
         severity="medium",
-        source_ip="10.0.0.50",
-        user_agent="python-requests/2.28.0",
+        ip_address="10.0.0.50",
         resource="api_keys_production.txt",
-        region="europe-west1",
+        region="eu-west-1",
         details={
+            'user_agent': "python-requests/2.28.0",
             'access_count': 15,
             'time_window': 300,
             'requests_per_second': 0.05
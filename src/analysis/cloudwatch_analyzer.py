@@ -4,15 +4,66 @@ Analyzes S3 access logs stored in CloudWatch for suspicious patterns
 """
 
 import os
+import re
 import json
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from collections import defaultdict
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from dataclasses import dataclass
+import numpy as np
+import orjson
+import pandas as pd
 import pytz
 
 
-@dataclass
+SUSPICIOUS_AGENT_RE = re.compile(r'curl|wget|python|bot|crawler|scanner', re.IGNORECASE)
+
+# Log column name -> CloudWatch Logs Insights field it is read from
+LOG_COLUMNS = {
+    'timestamp': '@timestamp',
+    'bucket_name': 'bucket',
+    'object_name': 'key',
+    'remote_ip': 'remoteip',
+    'user_agent': 'useragent',
+    'operation': 'operation',
+    'http_status': 'httpstatus'
+}
+
+CLIENT_CONFIG = Config(max_pool_connections=32, retries={'mode': 'adaptive'})
+
+
+@lru_cache(maxsize=8)
+def _logs_client(region):
+    """CloudWatch Logs client shared by every analyzer in the same region"""
+    return boto3.client('logs', region_name=region, config=CLIENT_CONFIG)
+
+
+@lru_cache(maxsize=8)
+def _dynamodb_resource(region):
+    """DynamoDB resource shared by every analyzer in the same region"""
+    return boto3.resource('dynamodb', region_name=region, config=CLIENT_CONFIG)
+
+
+def _plain_numbers(value):
+    """Turn the Decimals DynamoDB returns for numbers back into ints and floats"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: _plain_numbers(item) for key, item in value.items()}
+    if isinstance(value, (list, set)):
+        return [_plain_numbers(item) for item in value]
+    return value
+
+
+@dataclass(slots=True, frozen=True)
 class SecurityEvent:
     """Represents a security event"""
     event_type: str
@@ -27,17 +78,26 @@ class SecurityEvent:
 class CloudWatchAnalyzer:
     """Analyzes CloudWatch logs for suspicious patterns"""
     
+    STORED_EVENT_CACHE_SIZE = 4096
+    
     def __init__(self, region=None):
         """Initialize CloudWatch client"""
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
-        self.cloudwatch_logs = boto3.client('logs', region_name=self.region)
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
+        self.scan_segments = int(os.getenv('DYNAMODB_SCAN_SEGMENTS', 4))
+        # Clients are cached per region so new analyzers reuse their connection pools
+        self.cloudwatch_logs = _logs_client(self.region)
+        self.dynamodb = _dynamodb_resource(self.region)
         self.log_group_name = '/aws/s3/access-logs'
         self.table_name = os.getenv('DYNAMODB_TABLE_NAME', 'honeypot_logs')
+        self.time_index_name = os.getenv('DYNAMODB_TIME_INDEX', 'ByTime')
         
         self.bulk_download_threshold = int(os.getenv('BULK_DOWNLOAD_THRESHOLD', 10))
         self.rapid_access_threshold = int(os.getenv('RAPID_ACCESS_THRESHOLD', 5))
         self.rapid_access_window = int(os.getenv('RAPID_ACCESS_WINDOW', 60))
+        
+        # (type, second, IP) keys already written by this analyzer, so repeats are not re-sent;
+        # kept in write order and trimmed to STORED_EVENT_CACHE_SIZE for long monitor runs
+        self._stored_event_keys = OrderedDict()
     
     def query_s3_access_logs(self, hours=24):
         """Query S3 access logs from CloudWatch Logs Insights"""
@@ -55,13 +115,18 @@ class CloudWatchAnalyzer:
                 logGroupName=self.log_group_name,
                 startTime=int(start_time.timestamp()),
                 endTime=int(end_time.timestamp()),
-                queryString=query
+                queryString=query,
+                limit=10000
             )
             
             query_id = response['queryId']
             
+            # Back off between polls (0.1s growing to 1s) instead of spinning on GetQueryResults
             status = 'Running'
+            delay = 0.1
             while status in ['Running', 'Scheduled']:
+                time.sleep(delay)
+                delay = min(delay * 1.5, 1.0)
                 response = self.cloudwatch_logs.get_query_results(queryId=query_id)
                 status = response['status']
             
@@ -69,55 +134,67 @@ class CloudWatchAnalyzer:
                 return self._parse_log_results(response['results'])
             else:
                 print(f"Query failed with status: {status}")
-                return []
+                return self._parse_log_results([])
                 
         except Exception as e:
             print(f"Error querying CloudWatch logs: {e}")
-            return []
+            return self._parse_log_results([])
+    
+    def _iter_log_rows(self, results):
+        """Yield one tuple per result row, with fields in LOG_COLUMNS order"""
+        sources = tuple(LOG_COLUMNS.values())
+        for result in results:
+            log_entry = {field['field']: field['value'] for field in result}
+            yield tuple(log_entry.get(source) for source in sources)
     
     def _parse_log_results(self, results):
-        """Parse CloudWatch Logs Insights results"""
-        parsed_logs = []
+        """Parse CloudWatch Logs Insights results into a columnar DataFrame"""
+        # Rows are streamed straight into the frame; no intermediate per-row dicts are kept
+        df = pd.DataFrame.from_records(
+            self._iter_log_rows(results), columns=list(LOG_COLUMNS), nrows=len(results)
+        ).astype(object)
+        # Unparseable timestamps become NaT instead of raising per row
+        df['ts'] = pd.to_datetime(df['timestamp'], utc=True, errors='coerce', format='mixed')
+        return df
+    
+    def _scan(self, df):
+        """Single grouping pass over the logs, building every detector's per-IP inputs at once"""
+        # Row-level checks are evaluated once for the whole frame, then split by IP
+        is_download = (df['operation'] == 'REST.GET.OBJECT').to_numpy()
+        is_abnormal = (df['ts'].dt.hour < 6).to_numpy()
+        is_suspicious = df['user_agent'].fillna('').str.contains(SUSPICIOUS_AGENT_RE).to_numpy()
+        epoch = (df['ts'] - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
         
-        for result in results:
-            log_entry = {}
-            for field in result:
-                log_entry[field['field']] = field['value']
-            
-            parsed_logs.append({
-                'timestamp': log_entry.get('@timestamp'),
-                'bucket_name': log_entry.get('bucket'),
-                'object_name': log_entry.get('key'),
-                'remote_ip': log_entry.get('remoteip'),
-                'user_agent': log_entry.get('useragent'),
-                'operation': log_entry.get('operation'),
-                'http_status': log_entry.get('httpstatus'),
-                'region': self.region
-            })
-        
-        return parsed_logs
+        per_ip = {}
+        for ip, rows in df.groupby('remote_ip', sort=False).indices.items():
+            times = epoch[rows]
+            per_ip[ip] = {
+                'downloads': rows[is_download[rows]],
+                'times': np.sort(times[~np.isnan(times)]),
+                'abnormal': rows[is_abnormal[rows]],
+                'suspicious': rows[is_suspicious[rows]]
+            }
+        
+        return per_ip
     
-    def detect_bulk_downloads(self, logs):
+    def detect_bulk_downloads(self, df, per_ip, now):
         """Detect bulk download patterns"""
         events = []
-        ip_downloads = defaultdict(list)
         
-        for log in logs:
-            if log.get('operation') == 'REST.GET.OBJECT':
-                ip_downloads[log['remote_ip']].append(log)
-        
-        for ip, downloads in ip_downloads.items():
+        for ip, acc in per_ip.items():
+            downloads = acc['downloads']
             if len(downloads) >= self.bulk_download_threshold:
+                first = df.iloc[downloads[0]]
                 event = SecurityEvent(
                     event_type='bulk_download',
                     severity='high',
-                    timestamp=datetime.now(pytz.UTC),
+                    timestamp=now,
                     ip_address=ip,
-                    resource=downloads[0]['bucket_name'],
+                    resource=first['bucket_name'],
                     details={
                         'download_count': len(downloads),
-                        'files': [d['object_name'] for d in downloads[:10]],
-                        'user_agent': downloads[0].get('user_agent', 'Unknown')
+                        'files': df['object_name'].iloc[downloads[:10]].tolist(),
+                        'user_agent': first['user_agent'] or 'Unknown'
                     },
                     region=self.region
                 )
@@ -125,88 +202,78 @@ class CloudWatchAnalyzer:
         
         return events
     
-    def detect_rapid_access(self, logs):
+    def detect_rapid_access(self, df, per_ip, now):
         """Detect rapid successive access patterns"""
         events = []
-        ip_access_times = defaultdict(list)
         
-        for log in logs:
-            try:
-                timestamp = datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00'))
-                ip_access_times[log['remote_ip']].append(timestamp)
-            except:
+        k = self.rapid_access_threshold
+        for ip, acc in per_ip.items():
+            arr = acc['times']
+            if len(arr) < k:
                 continue
-        
-        for ip, times in ip_access_times.items():
-            times.sort()
             
-            for i in range(len(times) - self.rapid_access_threshold + 1):
-                window_start = times[i]
-                window_end = times[i + self.rapid_access_threshold - 1]
-                
-                if (window_end - window_start).total_seconds() <= self.rapid_access_window:
-                    event = SecurityEvent(
-                        event_type='rapid_access',
-                        severity='medium',
-                        timestamp=datetime.now(pytz.UTC),
-                        ip_address=ip,
-                        resource='multiple',
-                        details={
-                            'access_count': self.rapid_access_threshold,
-                            'time_window': f"{self.rapid_access_window} seconds",
-                            'first_access': window_start.isoformat(),
-                            'last_access': window_end.isoformat()
-                        },
-                        region=self.region
-                    )
-                    events.append(event)
-                    break
+            # Span of every run of k consecutive accesses, computed in one vectorized subtraction
+            spans = arr[k - 1:] - arr[:len(arr) - k + 1]
+            hits = spans <= self.rapid_access_window
+            if not hits.any():
+                continue
+            
+            first = int(np.argmax(hits))
+            event = SecurityEvent(
+                event_type='rapid_access',
+                severity='medium',
+                timestamp=now,
+                ip_address=ip,
+                resource='multiple',
+                details={
+                    'access_count': k,
+                    'time_window': f"{self.rapid_access_window} seconds",
+                    'first_access': datetime.fromtimestamp(arr[first], pytz.UTC).isoformat(),
+                    'last_access': datetime.fromtimestamp(arr[first + k - 1], pytz.UTC).isoformat()
+                },
+                region=self.region
+            )
+            events.append(event)
         
         return events
     
-    def detect_abnormal_hours_access(self, logs):
+    def detect_abnormal_hours_access(self, df, per_ip, now):
         """Detect access during abnormal hours (midnight to 6 AM)"""
         events = []
-        abnormal_hours = range(0, 6)
         
-        for log in logs:
-            try:
-                timestamp = datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00'))
-                if timestamp.hour in abnormal_hours:
-                    event = SecurityEvent(
-                        event_type='abnormal_hours_access',
-                        severity='medium',
-                        timestamp=timestamp,
-                        ip_address=log['remote_ip'],
-                        resource=log['object_name'],
-                        details={
-                            'access_time': timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                            'operation': log.get('operation', 'Unknown')
-                        },
-                        region=self.region
-                    )
-                    events.append(event)
-            except:
-                continue
+        for ip, acc in per_ip.items():
+            for log in df.iloc[acc['abnormal']].itertuples(index=False):
+                timestamp = log.ts.to_pydatetime()
+                event = SecurityEvent(
+                    event_type='abnormal_hours_access',
+                    severity='medium',
+                    timestamp=timestamp,
+                    ip_address=ip,
+                    resource=log.object_name,
+                    details={
+                        'access_time': timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'),
+                        'operation': log.operation or 'Unknown'
+                    },
+                    region=self.region
+                )
+                events.append(event)
         
         return events
     
-    def detect_geolocation_anomaly(self, logs):
+    def detect_geolocation_anomaly(self, df, per_ip, now):
         """Detect access from unusual geographic locations"""
         events = []
-        suspicious_patterns = ['curl', 'wget', 'python', 'bot', 'crawler', 'scanner']
         
-        for log in logs:
-            user_agent = log.get('user_agent', '').lower()
-            if any(pattern in user_agent for pattern in suspicious_patterns):
+        for ip, acc in per_ip.items():
+            for log in df.iloc[acc['suspicious']].itertuples(index=False):
                 event = SecurityEvent(
                     event_type='suspicious_user_agent',
                     severity='medium',
-                    timestamp=datetime.now(pytz.UTC),
-                    ip_address=log['remote_ip'],
-                    resource=log['object_name'],
+                    timestamp=now,
+                    ip_address=ip,
+                    resource=log.object_name,
                     details={
-                        'user_agent': log.get('user_agent', 'Unknown'),
+                        'user_agent': log.user_agent or 'Unknown',
                         'reason': 'Automated tool detected'
                     },
                     region=self.region
@@ -215,75 +282,266 @@ class CloudWatchAnalyzer:
         
         return events
     
+    def build_event_item(self, event):
+        """Serialize a security event into a DynamoDB item"""
+        return {
+            # Events of one run share a detection time, so a short random suffix keeps ids unique
+            'event_id': f"{event.event_type}_{event.timestamp.timestamp()}_{event.ip_address}_{uuid.uuid4().hex[:6]}",
+            'timestamp': event.timestamp.isoformat(),
+            'event_date': event.timestamp.strftime('%Y-%m-%d'),
+            'event_type': event.event_type,
+            'severity': event.severity,
+            'ip_address': event.ip_address,
+            'resource': event.resource,
+            'region': event.region,
+            # Stored as a native map, as the Lambda does; the orjson round-trip turns numpy
+            # scalars into plain values and floats into the Decimals boto3 requires
+            'details': json.loads(orjson.dumps(event.details, option=orjson.OPT_SERIALIZE_NUMPY), parse_float=Decimal)
+        }
+    
     def store_event_in_dynamodb(self, event):
         """Store security event in DynamoDB"""
+        return self.store_events_in_dynamodb([event])
+    
+    def store_events_in_dynamodb(self, events):
+        """Store security events in DynamoDB with batched writes (25 items per request)"""
+        if not events:
+            return 0
+        
+        # Rows that repeat an event (same type, IP and second) collapse into one write
+        new_events = {}
+        for event in events:
+            key = (event.event_type, int(event.timestamp.timestamp()), event.ip_address)
+            if key not in self._stored_event_keys:
+                new_events.setdefault(key, event)
+        
         try:
             table = self.dynamodb.Table(self.table_name)
             
-            item = {
-                'event_id': f"{event.event_type}_{event.timestamp.timestamp()}_{event.ip_address}",
-                'timestamp': event.timestamp.isoformat(),
-                'event_type': event.event_type,
-                'severity': event.severity,
-                'ip_address': event.ip_address,
-                'resource': event.resource,
-                'region': event.region,
-                'details': json.dumps(event.details)
-            }
-            
-            table.put_item(Item=item)
+            # batch_writer buffers puts into BatchWriteItem calls and resends unprocessed items
+            with table.batch_writer(overwrite_by_pkeys=['event_id']) as batch:
+                for event in new_events.values():
+                    batch.put_item(Item=self.build_event_item(event))
             
         except Exception as e:
-            print(f"Error storing event in DynamoDB: {e}")
+            print(f"Error storing events in DynamoDB: {e}")
+            return 0
+        
+        # Keys are only remembered once the batch has flushed, so a failed write is retried next time
+        for key in new_events:
+            self._stored_event_keys[key] = None
+        while len(self._stored_event_keys) > self.STORED_EVENT_CACHE_SIZE:
+            self._stored_event_keys.popitem(last=False)
+        
+        return len(new_events)
     
-    def analyze_logs(self, hours=24):
-        """Run all detection patterns"""
+    def analyze_logs(self, hours=24, df=None):
+        """Run all detection patterns, on df when the logs were already queried"""
         print(f"\n{'='*60}")
         print(f"Analyzing S3 access logs for the last {hours} hours")
         print(f"{'='*60}\n")
         
-        logs = self.query_s3_access_logs(hours)
-        print(f"Retrieved {len(logs)} log entries")
+        if df is None:
+            df = self.query_s3_access_logs(hours)
+        print(f"Retrieved {len(df)} log entries")
         
-        if not logs:
+        if df.empty:
             print("No logs found to analyze")
             return {}
         
+        per_ip = self._scan(df)
+        now = datetime.now(pytz.UTC)
+        
         all_events = {
-            'bulk_downloads': self.detect_bulk_downloads(logs),
-            'rapid_access': self.detect_rapid_access(logs),
-            'abnormal_hours': self.detect_abnormal_hours_access(logs),
-            'suspicious_agents': self.detect_geolocation_anomaly(logs)
+            'bulk_downloads': self.detect_bulk_downloads(df, per_ip, now),
+            'rapid_access': self.detect_rapid_access(df, per_ip, now),
+            'abnormal_hours': self.detect_abnormal_hours_access(df, per_ip, now),
+            'suspicious_agents': self.detect_geolocation_anomaly(df, per_ip, now)
         }
         
         for event_type, events in all_events.items():
             print(f"\n{event_type}: {len(events)} events detected")
-            for event in events:
-                self.store_event_in_dynamodb(event)
+        
+        self.store_events_in_dynamodb([event for events in all_events.values() for event in events])
         
         return all_events
     
+    def _read_pages(self, operation, request_kwargs):
+        """Read and deserialize every page of a low-level scan or query call"""
+        deserializer = TypeDeserializer()
+        request_kwargs = dict(request_kwargs)
+        
+        # A single call stops at 1 MB; follow LastEvaluatedKey to read every page
+        items = []
+        while True:
+            response = operation(**request_kwargs)
+            for item in response.get('Items', []):
+                items.append({key: deserializer.deserialize(value) for key, value in item.items()})
+            if 'LastEvaluatedKey' not in response:
+                break
+            request_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        return items
+    
+    def _scan_segment(self, segment, scan_kwargs):
+        """Read every page of one parallel scan segment"""
+        return self._read_pages(
+            self.dynamodb.meta.client.scan,
+            dict(scan_kwargs, Segment=segment, TotalSegments=self.scan_segments)
+        )
+    
+    def _query_event_date(self, event_date, cutoff_time):
+        """Read one day's events at or after the cutoff from the time index"""
+        return self._read_pages(self.dynamodb.meta.client.query, {
+            'TableName': self.table_name,
+            'IndexName': self.time_index_name,
+            'KeyConditionExpression': '#day = :day AND #ts >= :cutoff',
+            'ExpressionAttributeNames': {'#day': 'event_date', '#ts': 'timestamp'},
+            'ExpressionAttributeValues': {':day': {'S': event_date}, ':cutoff': {'S': cutoff_time}}
+        })
+    
+    def _scan_recent_items(self, cutoff_time):
+        """Full-table parallel scan fallback for tables without the time index"""
+        scan_kwargs = {
+            'TableName': self.table_name,
+            'FilterExpression': '#ts >= :cutoff',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+            'ExpressionAttributeValues': {':cutoff': {'S': cutoff_time}}
+        }
+        
+        # Segments are scanned concurrently on the thread-safe low-level client
+        with ThreadPoolExecutor(max_workers=self.scan_segments) as executor:
+            segments = executor.map(
+                lambda segment: self._scan_segment(segment, scan_kwargs),
+                range(self.scan_segments)
+            )
+            return [item for segment_items in segments for item in segment_items]
+    
+    def _latest_on_date(self, event_date):
+        """Newest timestamp stored for one day, read as a single-item descending index query"""
+        response = self.dynamodb.meta.client.query(
+            TableName=self.table_name,
+            IndexName=self.time_index_name,
+            KeyConditionExpression='#day = :day',
+            ProjectionExpression='#ts',
+            ExpressionAttributeNames={'#day': 'event_date', '#ts': 'timestamp'},
+            ExpressionAttributeValues={':day': {'S': event_date}},
+            ScanIndexForward=False,
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0]['timestamp']['S'] if items else None
+    
+    def _scan_latest_timestamp(self):
+        """Full-table parallel scan fallback for tables without the time index"""
+        scan_kwargs = {
+            'TableName': self.table_name,
+            'ProjectionExpression': '#ts',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'}
+        }
+        
+        with ThreadPoolExecutor(max_workers=self.scan_segments) as executor:
+            segments = executor.map(
+                lambda segment: self._scan_segment(segment, scan_kwargs),
+                range(self.scan_segments)
+            )
+            return max(
+                (item['timestamp'] for segment_items in segments for item in segment_items),
+                default=None
+            )
+    
+    def backfill_event_dates(self):
+        """Add event_date to items written before it existed, so the sparse time index sees them"""
+        scan_kwargs = {
+            'TableName': self.table_name,
+            'FilterExpression': 'attribute_not_exists(#day)',
+            'ProjectionExpression': 'event_id, #ts',
+            'ExpressionAttributeNames': {'#day': 'event_date', '#ts': 'timestamp'}
+        }
+        
+        with ThreadPoolExecutor(max_workers=self.scan_segments) as executor:
+            segments = executor.map(
+                lambda segment: self._scan_segment(segment, scan_kwargs),
+                range(self.scan_segments)
+            )
+            items = [item for segment_items in segments for item in segment_items]
+        
+        client = self.dynamodb.meta.client
+        for item in items:
+            # Timestamps are ISO strings, so the day is their first ten characters
+            client.update_item(
+                TableName=self.table_name,
+                Key={'event_id': {'S': item['event_id']}},
+                UpdateExpression='SET #day = :day',
+                ExpressionAttributeNames={'#day': 'event_date'},
+                ExpressionAttributeValues={':day': {'S': item['timestamp'][:10]}}
+            )
+        
+        return len(items)
+    
+    def get_latest_event_timestamp(self, lookback_days=7):
+        """Get the newest event timestamp from the time index, walking back from today"""
+        try:
+            today = datetime.now(pytz.UTC).date()
+            
+            # Today's partition normally answers in one call; earlier days are only read when it is empty
+            try:
+                for offset in range(lookback_days + 1):
+                    latest = self._latest_on_date((today - timedelta(days=offset)).strftime('%Y-%m-%d'))
+                    if latest:
+                        return latest
+                return None
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ValidationException':
+                    raise
+                print(f"Time index {self.time_index_name} unavailable, scanning table instead")
+                return self._scan_latest_timestamp()
+            
+        except Exception as e:
+            print(f"Error reading latest event timestamp from DynamoDB: {e}")
+            return None
+    
     def get_recent_events(self, hours=24):
-        """Get recent security events from DynamoDB"""
+        """Get recent security events from DynamoDB, newest first"""
         try:
-            table = self.dynamodb.Table(self.table_name)
+            now = datetime.now(pytz.UTC)
+            cutoff = now - timedelta(hours=hours)
+            cutoff_time = cutoff.isoformat()
             
-            cutoff_time = (datetime.now(pytz.UTC) - timedelta(hours=hours)).isoformat()
+            # The time index is partitioned by day, so only the days the window touches are queried
+            event_dates = [
+                (cutoff + timedelta(days=offset)).strftime('%Y-%m-%d')
+                for offset in range((now.date() - cutoff.date()).days + 1)
+            ]
             
-            response = table.scan(
-                FilterExpression='#ts >= :cutoff',
-                ExpressionAttributeNames={'#ts': 'timestamp'},
-                ExpressionAttributeValues={':cutoff': cutoff_time}
-            )
+            try:
+                with ThreadPoolExecutor(max_workers=min(len(event_dates), 8)) as executor:
+                    days = executor.map(
+                        lambda event_date: self._query_event_date(event_date, cutoff_time),
+                        event_dates
+                    )
+                    items = [item for day_items in days for item in day_items]
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ValidationException':
+                    raise
+                print(f"Time index {self.time_index_name} unavailable, scanning table instead")
+                items = self._scan_recent_items(cutoff_time)
+            
+            # Day queries come back oldest first and scans unordered; callers expect newest first.
+            # Timestamps are UTC ISO strings, so they sort chronologically as text
+            items.sort(key=lambda item: item['timestamp'], reverse=True)
             
             events = []
-            for item in response.get('Items', []):
+            for item in items:
                 details = item.get('details', {})
                 if isinstance(details, str):
+                    # Items written before details became a native map
                     try:
                         details = json.loads(details)
                     except:
                         details = {}
+                else:
+                    details = _plain_numbers(details)
                 
                 events.append({
                     'event_id': item['event_id'],
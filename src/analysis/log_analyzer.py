@@ -4,15 +4,22 @@ Analyzes GCP logs to detect suspicious activities and attack patterns
 """
 
 import os
-from datetime import datetime, timedelta
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import List, Dict, Optional
-from collections import defaultdict
+import numpy as np
+import pandas as pd
 import pytz
 from google.cloud import bigquery, logging as cloud_logging
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecurityEvent:
     """Represents a detected security event"""
     timestamp: datetime
@@ -49,252 +56,350 @@ class LogAnalyzer:
         
         self.suspicious_countries = ['RU', 'CN', 'KP', 'IR', 'SY']
         self.suspicious_user_agents = ['curl', 'wget', 'python-requests', 'scrapy', 'bot']
+        
+        self._suspicious_country_set = frozenset(self.suspicious_countries)
+        
+        # Country lookups walk the GeoLite2 prefix tree; without it no IP can be placed
+        geoip_path = os.getenv('GEOIP_DATABASE', 'GeoLite2-Country.mmdb')
+        if maxminddb and os.path.exists(geoip_path):
+            self._geo = maxminddb.open_database(geoip_path)
+        else:
+            print("️  GeoIP database not available, geolocation detection disabled")
+            self._geo = None
+        
+        # The keyword list becomes one alternation, so a row is scanned once rather than once per keyword
+        self._user_agent_re = re.compile('|'.join(map(re.escape, self.suspicious_user_agents)), re.IGNORECASE)
     
-    def get_recent_access_logs(self, hours: int = 24) -> List[Dict]:
+    def _run_access_log_query(self, hours: int = 24) -> bigquery.QueryJob:
         """
-        Retrieve recent access logs from BigQuery
+        Run the recent access log query and wait for it to finish
         
         Args:
             hours: Number of hours to look back
             
         Returns:
-            List of log entries
+            Finished query job; its result table holds the window's rows
         """
         query = f"""
         SELECT
             timestamp,
-            resource.labels.bucket_name,
-            resource.labels.object_name,
-            httpRequest.requestMethod,
-            httpRequest.status,
-            httpRequest.userAgent,
-            httpRequest.remoteIp,
-            httpRequest.requestUrl,
-            labels.region
+            resource.labels.bucket_name AS bucket,
+            resource.labels.object_name AS object,
+            httpRequest.requestMethod AS method,
+            httpRequest.status AS status,
+            httpRequest.userAgent AS user_agent,
+            httpRequest.remoteIp AS ip,
+            httpRequest.requestUrl AS url,
+            IFNULL(labels.region, 'unknown') AS region
         FROM
             `{self.project_id}.{self.dataset_id}.storage_logs`
         WHERE
-            timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {hours} HOUR)
+            timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @hours HOUR)
         ORDER BY
             timestamp DESC
         """
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('hours', 'INT64', hours)
+        ])
         
-        try:
-            query_job = self.bq_client.query(query)
-            results = query_job.result()
-            
-            logs = []
-            for row in results:
-                logs.append({
-                    'timestamp': row.timestamp,
-                    'bucket': row.bucket_name,
-                    'object': row.object_name,
-                    'method': row.requestMethod,
-                    'status': row.status,
-                    'user_agent': row.userAgent,
-                    'ip': row.remoteIp,
-                    'url': row.requestUrl,
-                    'region': row.get('region', 'unknown')
-                })
+        query_job = self.bq_client.query(query, job_config=job_config)
+        query_job.result()
+        return query_job
+    
+    def get_recent_access_logs(self, hours: int = 24, query_job: bigquery.QueryJob = None) -> pd.DataFrame:
+        """
+        Retrieve recent access logs from BigQuery
+        
+        Args:
+            hours: Number of hours to look back
+            query_job: Finished access log query to download instead of running a new one
             
-            return logs
+        Returns:
+            DataFrame of log entries, one column per entry field
+        """
+        try:
+            query_job = query_job or self._run_access_log_query(hours)
+            # Columns already carry the entry keys, so the Storage Read API's
+            # Arrow batches become the frame without a per-row loop
+            df = query_job.to_dataframe(create_bqstorage_client=True)
+            # Typed once here; detectors use the .dt accessors without re-parsing
+            df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+            return df
         except Exception as e:
             print(f"Error fetching logs: {e}")
-            return []
+            return pd.DataFrame()
     
-    def detect_bulk_downloads(self, logs: List[Dict]) -> List[SecurityEvent]:
+    def get_ip_aggregates(self, query_job: bigquery.QueryJob) -> List[Dict]:
         """
-        Detect bulk download attempts
+        Aggregate an access log window per source IP inside BigQuery
+        
+        The aggregation reads the finished row query's result table rather
+        than storage_logs, so the window is scanned from the source only once.
+        Only IPs that cross the bulk download or abnormal hours threshold
+        are returned.
         
         Args:
-            logs: List of log entries
+            query_job: Finished access log query from _run_access_log_query
             
         Returns:
-            List of security events
+            List of per-IP aggregate rows
         """
-        events = []
+        rows = query_job.destination
+        query = f"""
+        WITH base AS (
+            SELECT
+                ip,
+                timestamp,
+                object,
+                user_agent,
+                IFNULL(method = 'GET' AND status = 200, FALSE) AS is_download,
+                EXTRACT(HOUR FROM timestamp) >= @abnormal_start
+                    AND EXTRACT(HOUR FROM timestamp) < @abnormal_end AS is_abnormal
+            FROM
+                `{rows.project}.{rows.dataset_id}.{rows.table_id}`
+            WHERE
+                ip IS NOT NULL
+        )
+        SELECT
+            ip,
+            COUNTIF(is_download) AS downloads,
+            APPROX_COUNT_DISTINCT(IF(is_download, object, NULL)) AS download_objects,
+            MIN(IF(is_download, timestamp, NULL)) AS first_download,
+            MAX(IF(is_download, timestamp, NULL)) AS last_download,
+            ARRAY_AGG(DISTINCT IF(is_download, object, NULL) IGNORE NULLS LIMIT 5) AS sample_objects,
+            ARRAY_AGG(IF(is_download, user_agent, NULL) IGNORE NULLS ORDER BY timestamp DESC LIMIT 1) AS download_agent,
+            COUNTIF(is_abnormal) AS abnormal,
+            APPROX_COUNT_DISTINCT(IF(is_abnormal, object, NULL)) AS abnormal_objects,
+            MAX(IF(is_abnormal, timestamp, NULL)) AS last_abnormal,
+            ARRAY_AGG(IF(is_abnormal, STRUCT(object, user_agent), NULL) IGNORE NULLS ORDER BY timestamp DESC LIMIT 1) AS abnormal_sample
+        FROM
+            base
+        GROUP BY
+            ip
+        HAVING
+            downloads >= @bulk_threshold OR abnormal >= @abnormal_min
+        """
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('abnormal_start', 'INT64', self.abnormal_hours_start),
+            bigquery.ScalarQueryParameter('abnormal_end', 'INT64', self.abnormal_hours_end),
+            bigquery.ScalarQueryParameter('bulk_threshold', 'INT64', self.bulk_download_threshold),
+            bigquery.ScalarQueryParameter('abnormal_min', 'INT64', 5)
+        ])
         
-        ip_downloads = defaultdict(int)
-        ip_resources = defaultdict(set)
-        ip_timestamps = defaultdict(list)
+        try:
+            return [dict(row.items()) for row in self.bq_client.query(query, job_config=job_config).result()]
+        except Exception as e:
+            print(f"Error aggregating logs: {e}")
+            return []
+    
+    def events_from_aggregates(self, aggregates: List[Dict]) -> Dict[str, List[SecurityEvent]]:
+        """
+        Map per-IP aggregate rows to bulk download and abnormal hours events
         
-        for log in logs:
-            ip = log['ip']
-            if log['method'] == 'GET' and log['status'] == 200:
-                ip_downloads[ip] += 1
-                ip_resources[ip].add(log['object'])
-                ip_timestamps[ip].append(log['timestamp'])
+        Args:
+            aggregates: Rows returned by get_ip_aggregates
+            
+        Returns:
+            Dictionary of event_type -> list of events
+        """
+        bulk_events = []
+        abnormal_events = []
+        time_range = f"{self.abnormal_hours_start:02d}:00 - {self.abnormal_hours_end:02d}:00"
         
-        for ip, count in ip_downloads.items():
-            if count >= self.bulk_download_threshold:
-                events.append(SecurityEvent(
-                    timestamp=max(ip_timestamps[ip]),
+        for row in aggregates:
+            ip = row['ip']
+            
+            if row['downloads'] >= self.bulk_download_threshold:
+                agents = row['download_agent']
+                bulk_events.append(SecurityEvent(
+                    timestamp=row['last_download'],
                     event_type="bulk_download",
                     severity="high",
                     source_ip=ip,
-                    user_agent=logs[0]['user_agent'],
-                    resource=", ".join(list(ip_resources[ip])[:5]),
+                    user_agent=agents[0] if agents else "",
+                    resource=", ".join(row['sample_objects']),
                     details={
-                        'download_count': count,
-                        'unique_resources': len(ip_resources[ip]),
-                        'time_span': (max(ip_timestamps[ip]) - min(ip_timestamps[ip])).total_seconds()
+                        'download_count': row['downloads'],
+                        'unique_resources': row['download_objects'],
+                        'time_span': (row['last_download'] - row['first_download']).total_seconds()
+                    }
+                ))
+            
+            if row['abnormal'] >= 5:
+                sample = row['abnormal_sample'][0]
+                abnormal_events.append(SecurityEvent(
+                    timestamp=row['last_abnormal'],
+                    event_type="abnormal_hours_access",
+                    severity="medium",
+                    source_ip=ip,
+                    user_agent=sample['user_agent'],
+                    resource=sample['object'],
+                    details={
+                        'access_count': row['abnormal'],
+                        'time_range': time_range,
+                        'unique_resources': row['abnormal_objects']
                     }
                 ))
         
-        return events
+        return {'bulk_download': bulk_events, 'abnormal_hours': abnormal_events}
     
-    def detect_rapid_access(self, logs: List[Dict]) -> List[SecurityEvent]:
+    def _lookup_country(self, ip: str) -> Optional[str]:
         """
-        Detect rapid successive access from same source
+        Resolve an IP to its ISO country code
         
         Args:
-            logs: List of log entries
+            ip: Source IP address
             
         Returns:
-            List of security events
+            Two-letter country code, or None when unknown
         """
-        events = []
+        if self._geo is None:
+            return None
         
-        ip_accesses = defaultdict(list)
-        for log in logs:
-            ip_accesses[log['ip']].append({
-                'timestamp': log['timestamp'],
-                'resource': log['object'],
-                'user_agent': log['user_agent']
-            })
+        try:
+            record = self._geo.get(ip)
+        except ValueError:
+            return None
         
-        for ip, accesses in ip_accesses.items():
-            accesses.sort(key=lambda x: x['timestamp'])
-            
-            for i in range(len(accesses)):
-                window_end = accesses[i]['timestamp'] + timedelta(seconds=self.rapid_access_window)
-                window_accesses = [
-                    a for a in accesses[i:]
-                    if a['timestamp'] <= window_end
-                ]
-                
-                if len(window_accesses) >= self.rapid_access_threshold:
-                    events.append(SecurityEvent(
-                        timestamp=accesses[i]['timestamp'],
-                        event_type="rapid_access",
-                        severity="medium",
-                        source_ip=ip,
-                        user_agent=window_accesses[0]['user_agent'],
-                        resource=window_accesses[0]['resource'],
-                        details={
-                            'access_count': len(window_accesses),
-                            'time_window': self.rapid_access_window,
-                            'requests_per_second': len(window_accesses) / self.rapid_access_window
-                        }
-                    ))
-                    break
+        return (record or {}).get('country', {}).get('iso_code')
+    
+    def _scan(self, logs: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Single grouping pass over the logs, building every detector's per-IP inputs at once
         
-        return events
+        Args:
+            logs: DataFrame of log entries
+            
+        Returns:
+            Dictionary of ip -> row positions (in time order) per detector, plus its country
+        """
+        # Row-level checks are evaluated once for the whole frame, then split by IP
+        # (download and abnormal-hours counts come from get_ip_aggregates instead).
+        # Logs repeat a handful of clients, so each distinct agent string is matched once
+        agent_codes, agents = pd.factorize(logs['user_agent'].fillna(''))
+        is_suspicious = pd.Series(agents).str.contains(self._user_agent_re).to_numpy(dtype=bool)[agent_codes]
+        epoch = (logs['timestamp'] - logs['timestamp'].min()).dt.total_seconds().to_numpy()
+        
+        # One lexsort orders the whole frame by IP, then time; each IP is a contiguous run
+        ip_codes, ips = pd.factorize(logs['ip'])
+        ordered = np.lexsort((epoch, ip_codes))
+        ordered = ordered[ip_codes[ordered] >= 0]
+        boundaries = np.flatnonzero(np.diff(ip_codes[ordered])) + 1
+        
+        per_ip = {}
+        for order in np.split(ordered, boundaries):
+            if not len(order):
+                continue
+            ip = ips[ip_codes[order[0]]]
+            per_ip[ip] = {
+                'rows': order,
+                'times': epoch[order],
+                'suspicious': order[is_suspicious[order]],
+                'country': self._lookup_country(ip)
+            }
+        
+        return per_ip
     
-    def detect_abnormal_hours_access(self, logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_rapid_access(self, logs: pd.DataFrame, per_ip: Dict[str, Dict]) -> List[SecurityEvent]:
         """
-        Detect access during abnormal hours (e.g., 0-6 AM)
+        Detect rapid successive access from same source
         
         Args:
-            logs: List of log entries
+            logs: DataFrame of log entries
+            per_ip: Per-IP row positions from _scan
             
         Returns:
             List of security events
         """
         events = []
-        
-        ip_abnormal_accesses = defaultdict(list)
-        
-        for log in logs:
-            timestamp = log['timestamp']
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp)
-            
-            hour = timestamp.hour
+        window = self.rapid_access_window
+        
+        for ip, acc in per_ip.items():
+            times = acc['times']
+            # For every access, the number of accesses up to window seconds later
+            counts = np.searchsorted(times, times + window, side='right') - np.arange(len(times))
+            hits = np.flatnonzero(counts >= self.rapid_access_threshold)
+            if not len(hits):
+                continue
             
-            if self.abnormal_hours_start <= hour < self.abnormal_hours_end:
-                ip_abnormal_accesses[log['ip']].append({
-                    'timestamp': timestamp,
-                    'resource': log['object'],
-                    'user_agent': log['user_agent']
-                })
-        
-        for ip, accesses in ip_abnormal_accesses.items():
-            if len(accesses) >= 5:
-                events.append(SecurityEvent(
-                    timestamp=max(a['timestamp'] for a in accesses),
-                    event_type="abnormal_hours_access",
-                    severity="medium",
-                    source_ip=ip,
-                    user_agent=accesses[0]['user_agent'],
-                    resource=accesses[0]['resource'],
-                    details={
-                        'access_count': len(accesses),
-                        'time_range': f"{self.abnormal_hours_start:02d}:00 - {self.abnormal_hours_end:02d}:00",
-                        'unique_resources': len(set(a['resource'] for a in accesses))
-                    }
-                ))
+            first = logs.iloc[acc['rows'][hits[0]]]
+            access_count = int(counts[hits[0]])
+            events.append(SecurityEvent(
+                timestamp=first['timestamp'],
+                event_type="rapid_access",
+                severity="medium",
+                source_ip=ip,
+                user_agent=first['user_agent'],
+                resource=first['object'],
+                details={
+                    'access_count': access_count,
+                    'time_window': self.rapid_access_window,
+                    'requests_per_second': access_count / self.rapid_access_window
+                }
+            ))
         
         return events
     
-    def detect_geolocation_anomaly(self, logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_geolocation_anomaly(self, logs: pd.DataFrame, per_ip: Dict[str, Dict]) -> List[SecurityEvent]:
         """
         Detect access from suspicious geolocations
         
         Args:
-            logs: List of log entries
+            logs: DataFrame of log entries
+            per_ip: Per-IP row positions from _scan
             
         Returns:
             List of security events
         """
         events = []
         
-        
-        for log in logs:
-            ip = log['ip']
+        for ip, acc in per_ip.items():
+            country = acc['country']
+            if country not in self._suspicious_country_set:
+                continue
             
-            if any(country in str(ip) for country in self.suspicious_countries):
+            for log in logs.iloc[acc['rows']].itertuples(index=False):
                 events.append(SecurityEvent(
-                    timestamp=log['timestamp'],
+                    timestamp=log.timestamp,
                     event_type="geolocation_anomaly",
                     severity="high",
                     source_ip=ip,
-                    user_agent=log['user_agent'],
-                    resource=log['object'],
+                    user_agent=log.user_agent,
+                    resource=log.object,
                     details={
                         'reason': 'Access from suspicious country',
-                        'ip_address': ip
+                        'ip_address': ip,
+                        'country': country
                     }
                 ))
         
         return events
     
-    def detect_user_agent_anomaly(self, logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_user_agent_anomaly(self, logs: pd.DataFrame, per_ip: Dict[str, Dict]) -> List[SecurityEvent]:
         """
         Detect automated tools or suspicious user agents
         
         Args:
-            logs: List of log entries
+            logs: DataFrame of log entries
+            per_ip: Per-IP row positions from _scan
             
         Returns:
             List of security events
         """
         events = []
         
-        for log in logs:
-            user_agent = log['user_agent'].lower()
-            
-            if any(suspicious in user_agent for suspicious in self.suspicious_user_agents):
+        for ip, acc in per_ip.items():
+            for log in logs.iloc[acc['suspicious']].itertuples(index=False):
                 events.append(SecurityEvent(
-                    timestamp=log['timestamp'],
+                    timestamp=log.timestamp,
                     event_type="user_agent_anomaly",
                     severity="medium",
-                    source_ip=log['ip'],
-                    user_agent=log['user_agent'],
-                    resource=log['object'],
+                    source_ip=ip,
+                    user_agent=log.user_agent,
+                    resource=log.object,
                     details={
                         'reason': 'Automated tool detected',
-                        'user_agent': log['user_agent']
+                        'user_agent': log.user_agent
                     }
                 ))
         
@@ -312,19 +417,33 @@ class LogAnalyzer:
         """
         print(f" Analyzing logs from the last {hours} hours...")
         
-        logs = self.get_recent_access_logs(hours)
+        try:
+            rows_job = self._run_access_log_query(hours)
+        except Exception as e:
+            print(f"Error fetching logs: {e}")
+            return {}
+        
+        # The aggregates read the finished query's result table, so they run
+        # while the rows stream down through the Storage Read API
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            aggregates_future = executor.submit(self.get_ip_aggregates, rows_job)
+            logs = self.get_recent_access_logs(hours, rows_job)
+            aggregates = aggregates_future.result()
         print(f" Found {len(logs)} log entries")
         
-        if not logs:
+        if logs.empty:
             print("️  No logs found")
             return {}
         
+        aggregated = self.events_from_aggregates(aggregates)
+        per_ip = self._scan(logs)
+        
         all_events = {
-            'bulk_download': self.detect_bulk_downloads(logs),
-            'rapid_access': self.detect_rapid_access(logs),
-            'abnormal_hours': self.detect_abnormal_hours_access(logs),
-            'geolocation_anomaly': self.detect_geolocation_anomaly(logs),
-            'user_agent_anomaly': self.detect_user_agent_anomaly(logs)
+            'bulk_download': aggregated['bulk_download'],
+            'rapid_access': self.detect_rapid_access(logs, per_ip),
+            'abnormal_hours': aggregated['abnormal_hours'],
+            'geolocation_anomaly': self.detect_geolocation_anomaly(logs, per_ip),
+            'user_agent_anomaly': self.detect_user_agent_anomaly(logs, per_ip)
         }
         
         total_events = sum(len(events) for events in all_events.values())
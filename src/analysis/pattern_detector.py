@@ -2,236 +2,229 @@
 Pattern Detector - Extended detection patterns for various attack types
 """
 
-from typing import List, Dict
-from collections import defaultdict
-from datetime import datetime, timedelta
+from typing import List, Dict, Union
+import pandas as pd
 from .cloudwatch_analyzer import SecurityEvent
 
+
+def _as_frame(logs: Union[pd.DataFrame, List[Dict]]) -> pd.DataFrame:
+    """Accept a DataFrame or a list of log entries, with parsed timestamps"""
+    df = logs if isinstance(logs, pd.DataFrame) else pd.DataFrame(logs)
+    if df.empty:
+        return df
+    
+    # Frames from LogAnalyzer arrive already typed, so only raw entries are parsed
+    if not isinstance(df['timestamp'].dtype, pd.DatetimeTZDtype):
+        df = df.assign(timestamp=pd.to_datetime(df['timestamp'], utc=True, format='mixed'))
+    if 'region' not in df:
+        df = df.assign(region='unknown')
+    if not df['timestamp'].is_monotonic_increasing:
+        df = df.sort_values('timestamp', kind='stable')
+    return df
+
+
 class PatternDetector:
     """Detect advanced attack patterns"""
     
     @staticmethod
-    def detect_credential_stuffing(logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_credential_stuffing(logs: Union[pd.DataFrame, List[Dict]]) -> List[SecurityEvent]:
         """
         Detect credential stuffing attacks (multiple failed auth attempts)
         
         Args:
-            logs: List of log entries
+            logs: DataFrame or list of log entries
             
         Returns:
             List of security events
         """
-        events = []
-        
-        ip_failed_auth = defaultdict(list)
-        
-        for log in logs:
-            if log.get('status') in [401, 403]:
-                ip_failed_auth[log['ip']].append({
-                    'timestamp': log['timestamp'],
-                    'resource': log['object'],
-                    'user_agent': log['user_agent']
-                })
-        
-        for ip, failures in ip_failed_auth.items():
-            if len(failures) >= 5:
-                failures.sort(key=lambda x: x['timestamp'])
-                first = failures[0]['timestamp']
-                last = failures[-1]['timestamp']
-                
-                if isinstance(first, str):
-                    first = datetime.fromisoformat(first)
-                if isinstance(last, str):
-                    last = datetime.fromisoformat(last)
-                
-                if (last - first).total_seconds() <= 60:
-                    events.append(SecurityEvent(
-                        timestamp=last,
-                        event_type="credential_stuffing",
-                        severity="high",
-                        source_ip=ip,
-                        user_agent=failures[0]['user_agent'],
-                        resource=failures[0]['resource'],
-                        details={
-                            'failed_attempts': len(failures),
-                            'time_span': (last - first).total_seconds(),
-                            'attack_rate': len(failures) / max((last - first).total_seconds(), 1)
-                        }
-                    ))
-        
-        return events
+        df = _as_frame(logs)
+        if df.empty:
+            return []
+        
+        failures = df[df['status'].isin([401, 403])]
+        per_ip = failures.groupby('ip').agg(
+            count=('timestamp', 'size'),
+            first_seen=('timestamp', 'min'),
+            last_seen=('timestamp', 'max'),
+            resource=('object', 'first'),
+            user_agent=('user_agent', 'first'),
+            region=('region', 'first')
+        )
+        per_ip['span'] = (per_ip['last_seen'] - per_ip['first_seen']).dt.total_seconds()
+        flagged = per_ip[(per_ip['count'] >= 5) & (per_ip['span'] <= 60)]
+        
+        return [
+            SecurityEvent(
+                event_type="credential_stuffing",
+                severity="high",
+                timestamp=row.last_seen,
+                ip_address=row.Index,
+                resource=row.resource,
+                details={
+                    'user_agent': row.user_agent,
+                    'failed_attempts': int(row.count),
+                    'time_span': row.span,
+                    'attack_rate': row.count / max(row.span, 1)
+                },
+                region=row.region
+            )
+            for row in flagged.itertuples()
+        ]
     
     @staticmethod
-    def detect_data_exfiltration(logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_data_exfiltration(logs: Union[pd.DataFrame, List[Dict]]) -> List[SecurityEvent]:
         """
         Detect unusual data download patterns (data exfiltration)
         
         Args:
-            logs: List of log entries
+            logs: DataFrame or list of log entries
             
         Returns:
             List of security events
         """
-        events = []
-        
-        ip_data_transfer = defaultdict(lambda: {'bytes': 0, 'files': 0, 'timestamps': []})
-        
-        for log in logs:
-            if log['method'] == 'GET' and log['status'] == 200:
-                ip = log['ip']
-                estimated_size = 1024 * 1024
-                ip_data_transfer[ip]['bytes'] += estimated_size
-                ip_data_transfer[ip]['files'] += 1
-                ip_data_transfer[ip]['timestamps'].append(log['timestamp'])
+        df = _as_frame(logs)
+        if df.empty:
+            return []
         
+        estimated_size_mb = 1
         threshold_mb = 100
-        for ip, data in ip_data_transfer.items():
-            size_mb = data['bytes'] / (1024 * 1024)
-            
-            if size_mb >= threshold_mb:
-                timestamps = data['timestamps']
-                first = min(timestamps)
-                last = max(timestamps)
-                
-                if isinstance(first, str):
-                    first = datetime.fromisoformat(first)
-                if isinstance(last, str):
-                    last = datetime.fromisoformat(last)
-                
-                events.append(SecurityEvent(
-                    timestamp=last,
-                    event_type="data_exfiltration",
-                    severity="critical",
-                    source_ip=ip,
-                    user_agent="",
-                    resource=f"{data['files']} files",
-                    details={
-                        'total_size_mb': round(size_mb, 2),
-                        'file_count': data['files'],
-                        'duration_seconds': (last - first).total_seconds(),
-                        'transfer_rate_mbps': round(size_mb / max((last - first).total_seconds(), 1), 2)
-                    }
-                ))
-        
-        return events
+        
+        # A NULL status (nullable Int64 from BigQuery) is not a download
+        downloads = df[((df['method'] == 'GET') & (df['status'] == 200)).fillna(False).astype(bool)]
+        per_ip = downloads.groupby('ip').agg(
+            files=('timestamp', 'size'),
+            first_seen=('timestamp', 'min'),
+            last_seen=('timestamp', 'max'),
+            region=('region', 'first')
+        )
+        per_ip['size_mb'] = per_ip['files'] * estimated_size_mb
+        per_ip['duration'] = (per_ip['last_seen'] - per_ip['first_seen']).dt.total_seconds()
+        
+        return [
+            SecurityEvent(
+                event_type="data_exfiltration",
+                severity="critical",
+                timestamp=row.last_seen,
+                ip_address=row.Index,
+                resource=f"{row.files} files",
+                details={
+                    'total_size_mb': round(float(row.size_mb), 2),
+                    'file_count': int(row.files),
+                    'duration_seconds': row.duration,
+                    'transfer_rate_mbps': round(row.size_mb / max(row.duration, 1), 2)
+                },
+                region=row.region
+            )
+            for row in per_ip[per_ip['size_mb'] >= threshold_mb].itertuples()
+        ]
     
     @staticmethod
-    def detect_port_scanning(logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_port_scanning(logs: Union[pd.DataFrame, List[Dict]]) -> List[SecurityEvent]:
         """
         Detect port scanning behavior (sequential access patterns)
         
         Args:
-            logs: List of log entries
+            logs: DataFrame or list of log entries
             
         Returns:
             List of security events
         """
-        events = []
-        
-        ip_resources = defaultdict(list)
-        
-        for log in logs:
-            ip_resources[log['ip']].append({
-                'timestamp': log['timestamp'],
-                'resource': log['object'],
-                'status': log['status']
-            })
-        
-        for ip, accesses in ip_resources.items():
-            accesses.sort(key=lambda x: x['timestamp'])
-            
-            unique_resources = set(a['resource'] for a in accesses)
-            
-            if len(unique_resources) >= 20:
-                first = accesses[0]['timestamp']
-                last = accesses[-1]['timestamp']
-                
-                if isinstance(first, str):
-                    first = datetime.fromisoformat(first)
-                if isinstance(last, str):
-                    last = datetime.fromisoformat(last)
-                
-                if (last - first).total_seconds() <= 120:
-                    events.append(SecurityEvent(
-                        timestamp=last,
-                        event_type="port_scanning",
-                        severity="medium",
-                        source_ip=ip,
-                        user_agent="",
-                        resource=f"{len(unique_resources)} resources",
-                        details={
-                            'unique_resources': len(unique_resources),
-                            'total_requests': len(accesses),
-                            'time_span': (last - first).total_seconds(),
-                            'scan_rate': len(accesses) / max((last - first).total_seconds(), 1)
-                        }
-                    ))
-        
-        return events
+        df = _as_frame(logs)
+        if df.empty:
+            return []
+        
+        per_ip = df.groupby('ip').agg(
+            requests=('timestamp', 'size'),
+            first_seen=('timestamp', 'min'),
+            last_seen=('timestamp', 'max'),
+            region=('region', 'first')
+        )
+        per_ip['span'] = (per_ip['last_seen'] - per_ip['first_seen']).dt.total_seconds()
+        # Twenty distinct resources need at least twenty requests, so the cheap
+        # count and span checks narrow the IPs before any distinct-object hashing
+        candidates = per_ip[(per_ip['requests'] >= 20) & (per_ip['span'] <= 120)].copy()
+        if candidates.empty:
+            return []
+        
+        candidates['unique'] = df[df['ip'].isin(candidates.index)].groupby('ip')['object'].nunique()
+        flagged = candidates[candidates['unique'] >= 20]
+        
+        return [
+            SecurityEvent(
+                event_type="port_scanning",
+                severity="medium",
+                timestamp=row.last_seen,
+                ip_address=row.Index,
+                resource=f"{row.unique} resources",
+                details={
+                    'unique_resources': int(row.unique),
+                    'total_requests': int(row.requests),
+                    'time_span': row.span,
+                    'scan_rate': row.requests / max(row.span, 1)
+                },
+                region=row.region
+            )
+            for row in flagged.itertuples()
+        ]
     
     @staticmethod
-    def detect_time_based_pattern(logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_time_based_pattern(logs: Union[pd.DataFrame, List[Dict]]) -> List[SecurityEvent]:
         """
         Detect time-based patterns (scheduled/automated attacks)
         
         Args:
-            logs: List of log entries
+            logs: DataFrame or list of log entries
             
         Returns:
             List of security events
         """
-        events = []
-        
-        ip_intervals = defaultdict(list)
-        
-        for log in logs:
-            ip = log['ip']
-            timestamp = log['timestamp']
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp)
-            
-            ip_intervals[ip].append(timestamp)
-        
-        for ip, timestamps in ip_intervals.items():
-            if len(timestamps) < 5:
-                continue
-            
-            timestamps.sort()
-            intervals = []
-            for i in range(1, len(timestamps)):
-                interval = (timestamps[i] - timestamps[i-1]).total_seconds()
-                intervals.append(interval)
-            
-            if intervals:
-                avg_interval = sum(intervals) / len(intervals)
-                variance = sum(abs(i - avg_interval) for i in intervals) / len(intervals)
-                
-                if variance / avg_interval < 0.1:
-                    events.append(SecurityEvent(
-                        timestamp=timestamps[-1],
-                        event_type="time_based_pattern",
-                        severity="medium",
-                        source_ip=ip,
-                        user_agent="",
-                        resource="",
-                        details={
-                            'average_interval_seconds': round(avg_interval, 2),
-                            'interval_variance': round(variance, 2),
-                            'request_count': len(timestamps),
-                            'pattern_type': 'automated_scheduled'
-                        }
-                    ))
-        
-        return events
+        df = _as_frame(logs)
+        if df.empty:
+            return []
+        
+        by_ip = df.groupby('ip')['timestamp']
+        intervals = by_ip.diff().dt.total_seconds().groupby(df['ip'])
+        
+        per_ip = pd.DataFrame({
+            'requests': by_ip.size(),
+            'last_seen': by_ip.max(),
+            'avg_interval': intervals.mean(),
+            'variance': intervals.std(ddof=0),
+            'region': df.groupby('ip')['region'].first()
+        })
+        # Coefficient of variation: near-constant spacing between requests means a scheduler
+        flagged = per_ip[
+            (per_ip['requests'] >= 5)
+            & (per_ip['avg_interval'] > 0)
+            & (per_ip['variance'] / per_ip['avg_interval'] < 0.1)
+        ]
+        
+        return [
+            SecurityEvent(
+                event_type="time_based_pattern",
+                severity="medium",
+                timestamp=row.last_seen,
+                ip_address=row.Index,
+                resource="",
+                details={
+                    'average_interval_seconds': round(row.avg_interval, 2),
+                    'interval_variance': round(row.variance, 2),
+                    'request_count': int(row.requests),
+                    'pattern_type': 'automated_scheduled'
+                },
+                region=row.region
+            )
+            for row in flagged.itertuples()
+        ]
     
     @staticmethod
-    def detect_impossible_travel(logs: List[Dict]) -> List[SecurityEvent]:
+    def detect_impossible_travel(logs: Union[pd.DataFrame, List[Dict]]) -> List[SecurityEvent]:
         """
         Detect impossible travel (access from geographically distant locations in short time)
         Note: Requires IP geolocation data
         
         Args:
-            logs: List of log entries
+            logs: DataFrame or list of log entries
             
         Returns:
             List of security events
@@ -3,80 +3,133 @@ Honey Token Generators Module
 Generates fake API keys, database credentials, and SSH keys
 """
 
+import base64
 import secrets
 import string
 import random
+from functools import lru_cache
 from typing import Dict, List
 from datetime import datetime
 
 
+ALPHANUMERIC = string.ascii_letters + string.digits
+
+
+@lru_cache(maxsize=None)
+def _byte_table(chars: str) -> bytes:
+    """Translation table mapping every byte value onto chars"""
+    return bytes(ord(chars[i % len(chars)]) for i in range(256))
+
+
+def _translator(chars: str):
+    """Encoder mapping raw random bytes onto chars with a C-level translate"""
+    table = _byte_table(chars)
+    # Bytes past the last whole multiple of len(chars) would favour the leading chars,
+    # so they are dropped and topped up from fresh draws until every position is filled
+    reject = bytes(range(256 - 256 % len(chars), 256))
+    
+    def encode(raw: bytes) -> str:
+        out = raw.translate(table, reject)
+        while len(out) < len(raw):
+            out += secrets.token_bytes(len(raw) - len(out)).translate(table, reject)
+        return out.decode('ascii')
+    
+    return encode
+
+
+_alphanumeric = _translator(ALPHANUMERIC)
+_digits = _translator(string.digits)
+
+
+def _slack_body(raw: bytes) -> str:
+    """Two 10-digit workspace/bot IDs followed by a 24-character secret"""
+    ids = _digits(raw[:20])
+    return f"{ids[:10]}-{ids[10:]}-{_alphanumeric(raw[20:])}"
+
+
+# Key name -> (prefix, random bytes per key, encoder)
+KEY_FORMATS = {
+    # The URL-safe base64 alphabet is exactly the Google key alphabet
+    "google_api_key": ("AIza", 27, lambda raw: base64.urlsafe_b64encode(raw)[:35].decode('ascii')),
+    # Real key IDs are base32 (A-Z, 2-7); 10 random bytes encode to 16 characters
+    "aws_access_key_id": ("AKIA", 10, lambda raw: base64.b32encode(raw).decode('ascii')),
+    "aws_secret_access_key": ("", 30, lambda raw: base64.b64encode(raw).decode('ascii')),
+    "stripe_live_key": ("sk_live_", 24, _alphanumeric),
+    "stripe_test_key": ("sk_test_", 24, _alphanumeric),
+    "github_token": ("ghp_", 36, _translator(ALPHANUMERIC + '_')),
+    "slack_bot_token": ("xoxb-", 44, _slack_body),
+    "openai_api_key": ("sk-", 48, _alphanumeric),
+}
+
+
+def _carve_keys(names: List[str]) -> List[str]:
+    """Build one key per name from a single CSPRNG read"""
+    pool = secrets.token_bytes(sum(KEY_FORMATS[name][1] for name in names))
+    keys = []
+    offset = 0
+    for name in names:
+        prefix, size, encode = KEY_FORMATS[name]
+        keys.append(prefix + encode(pool[offset:offset + size]))
+        offset += size
+    return keys
+
+
 class APIKeyGenerator:
     """Generate fake API keys for various services"""
     
     @staticmethod
     def generate_google_api_key() -> str:
         """Generate a fake Google API key (AIza...)"""
-        chars = string.ascii_letters + string.digits + '-_'
-        random_part = ''.join(secrets.choice(chars) for _ in range(35))
-        return f"AIza{random_part}"
+        return _carve_keys(["google_api_key"])[0]
     
     @staticmethod
     def generate_aws_access_key() -> str:
         """Generate a fake AWS access key (AKIA...)"""
-        chars = string.ascii_uppercase + string.digits
-        random_part = ''.join(secrets.choice(chars) for _ in range(16))
-        return f"AKIA{random_part}"
+        return _carve_keys(["aws_access_key_id"])[0]
     
     @staticmethod
     def generate_aws_secret_key() -> str:
         """Generate a fake AWS secret key"""
-        chars = string.ascii_letters + string.digits + '+/'
-        return ''.join(secrets.choice(chars) for _ in range(40))
+        return _carve_keys(["aws_secret_access_key"])[0]
     
     @staticmethod
     def generate_stripe_key(test: bool = False) -> str:
         """Generate a fake Stripe API key"""
-        prefix = "sk_test_" if test else "sk_live_"
-        chars = string.ascii_letters + string.digits
-        random_part = ''.join(secrets.choice(chars) for _ in range(24))
-        return f"{prefix}{random_part}"
+        return _carve_keys(["stripe_test_key" if test else "stripe_live_key"])[0]
     
     @staticmethod
     def generate_github_token() -> str:
         """Generate a fake GitHub personal access token"""
-        chars = string.ascii_letters + string.digits + '_'
-        random_part = ''.join(secrets.choice(chars) for _ in range(36))
-        return f"ghp_{random_part}"
+        return _carve_keys(["github_token"])[0]
     
     @staticmethod
     def generate_slack_token() -> str:
         """Generate a fake Slack bot token"""
-        part1 = ''.join(str(random.randint(0, 9)) for _ in range(10))
-        part2 = ''.join(str(random.randint(0, 9)) for _ in range(10))
-        chars = string.ascii_letters + string.digits
-        part3 = ''.join(secrets.choice(chars) for _ in range(24))
-        return f"xoxb-{part1}-{part2}-{part3}"
+        return _carve_keys(["slack_bot_token"])[0]
     
     @staticmethod
     def generate_openai_key() -> str:
         """Generate a fake OpenAI API key"""
-        chars = string.ascii_letters + string.digits
-        random_part = ''.join(secrets.choice(chars) for _ in range(48))
-        return f"sk-{random_part}"
+        return _carve_keys(["openai_api_key"])[0]
+    
+    @staticmethod
+    def generate_batch(service: str, count: int) -> List[str]:
+        """
+        Generate many keys of one type from a single random draw
+        
+        Args:
+            service: Key name from KEY_FORMATS (e.g. 'github_token')
+            count: Number of keys to generate
+            
+        Returns:
+            List of distinct fake keys
+        """
+        return _carve_keys([service] * count)
     
     @staticmethod
     def generate_all_api_keys() -> Dict[str, str]:
         """Generate all types of API keys"""
-        return {
-            "google_api_key": APIKeyGenerator.generate_google_api_key(),
-            "aws_access_key_id": APIKeyGenerator.generate_aws_access_key(),
-            "aws_secret_access_key": APIKeyGenerator.generate_aws_secret_key(),
-            "stripe_live_key": APIKeyGenerator.generate_stripe_key(test=False),
-            "stripe_test_key": APIKeyGenerator.generate_stripe_key(test=True),
-            "github_token": APIKeyGenerator.generate_github_token(),
-            "slack_bot_token": APIKeyGenerator.generate_slack_token(),
-            "openai_api_key": APIKeyGenerator.generate_openai_key(),
-        }
+        return dict(zip(KEY_FORMATS, _carve_keys(list(KEY_FORMATS))))
 
 
 class DatabaseCredentialGenerator:
@@ -112,15 +165,12 @@ class DatabaseCredentialGenerator:
     @staticmethod
     def generate_password(length: int = 16) -> str:
         """Generate a fake but realistic password"""
-        chars = string.ascii_letters + string.digits + '!@#$%'
-        password = ''.join(secrets.choice(chars) for _ in range(length))
-        if not any(c.isupper() for c in password):
-            password = password[:-1] + random.choice(string.ascii_uppercase)
-        if not any(c.isdigit() for c in password):
-            password = password[:-2] + str(random.randint(0, 9))
-        if not any(c in '!@#$%' for c in password):
-            password = password[:-3] + random.choice('!@#$%')
-        return password
+        # Decoy passwords guard nothing, so the C-level random.choices is enough;
+        # one character from each required class is placed up front instead of patched in
+        guaranteed = [random.choice(pool) for pool in (string.ascii_uppercase, string.digits, '!@#$%')]
+        chars = guaranteed + random.choices(ALPHANUMERIC + '!@#$%', k=length - len(guaranteed))
+        random.shuffle(chars)
+        return ''.join(chars)
     
     @staticmethod
     def generate_postgresql_credentials() -> Dict[str, str]:
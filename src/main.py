@@ -5,22 +5,24 @@ Main entry point for Cloud Honey Tokens Attribution System
 import os
 import sys
 import argparse
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.generators.api_keys import APIKeyGenerator, DatabaseCredentialGenerator
-from src.generators.ssh_keys import SSHKeyGenerator
-from src.storage.s3_file_creator import S3FileCreator
-from src.analysis.cloudwatch_analyzer import CloudWatchAnalyzer
-from src.analysis.pattern_detector import PatternDetector
-from src.alerts.email_alert import EmailAlertSystem
-from src.alerts.slack_alert import SlackAlertSystem
+# Project modules are imported inside each command, so a subcommand only pays
+# for the SDKs it uses (boto3, cryptography, the alert clients) at startup
 
 
-def generate_tokens(region: str = None, bucket_name: str = None):
+def generate_tokens(region: str = None, bucket_name: str = None, fast_keys: bool = False, key_cache: bool = False):
     """Generate and upload honey tokens"""
+    from src.generators.api_keys import APIKeyGenerator, DatabaseCredentialGenerator
+    from src.generators.ssh_keys import SSHKeyGenerator
+    from src.storage.s3_file_creator import S3FileCreator
+    
     print("=" * 60)
     print(" GENERATING HONEY TOKENS")
     print("=" * 60)
@@ -34,7 +36,7 @@ def generate_tokens(region: str = None, bucket_name: str = None):
     print(f" Generated {len(db_creds)} database credential sets")
     
     print("\n Generating SSH keys...")
-    ssh_keys = SSHKeyGenerator.generate_all_ssh_keys()
+    ssh_keys = SSHKeyGenerator.generate_all_ssh_keys(fast_mode=fast_keys, use_cache=key_cache)
     print(f" Generated {len(ssh_keys)} SSH key pairs")
     
     bucket = bucket_name or os.getenv('S3_BUCKET_NAME')
@@ -56,13 +58,15 @@ def generate_tokens(region: str = None, bucket_name: str = None):
         print(f"\n Error uploading files: {e}")
 
 
-def analyze_logs(hours: int = 24, send_alerts: bool = True):
+def analyze_logs(hours: int = 24, send_alerts: bool = True, region: str = None):
     """Analyze logs for security events"""
+    from src.analysis.cloudwatch_analyzer import CloudWatchAnalyzer
+    
     print("=" * 60)
     print(" ANALYZING LOGS")
     print("=" * 60)
     
-    region = os.getenv('AWS_REGION', 'us-east-1')
+    region = region or os.getenv('AWS_REGION', 'us-east-1')
     
     analyzer = CloudWatchAnalyzer(region=region)
     events = analyzer.analyze_logs(hours=hours)
@@ -77,10 +81,13 @@ def analyze_logs(hours: int = 24, send_alerts: bool = True):
     
     print(f"\n Total events detected: {len(all_events)}")
     
-    critical = sum(1 for e in all_events if e.severity == 'critical')
-    high = sum(1 for e in all_events if e.severity == 'high')
-    medium = sum(1 for e in all_events if e.severity == 'medium')
-    low = sum(1 for e in all_events if e.severity == 'low')
+    counts = Counter()
+    immediate_alerts = []
+    for e in all_events:
+        counts[e.severity] += 1
+        if e.severity in ('critical', 'high'):
+            immediate_alerts.append(e)
+    critical, high, medium, low = counts['critical'], counts['high'], counts['medium'], counts['low']
     
     if critical:
         print(f"    CRITICAL: {critical}")
@@ -94,20 +101,25 @@ def analyze_logs(hours: int = 24, send_alerts: bool = True):
     if send_alerts:
         print("\n Sending alerts...")
         
+        from src.alerts.email_alert import EmailAlertSystem
+        from src.alerts.slack_alert import SlackAlertSystem
+        
         email_system = EmailAlertSystem()
         slack_system = SlackAlertSystem()
         
-        immediate_alerts = [e for e in all_events if e.severity in ['critical', 'high']]
-        for event in immediate_alerts:
-            email_system.send_alert(event)
-            slack_system.send_alert(event)
-        
+        # Every send is an independent SMTP/HTTPS round-trip, so both channels
+        # share one pool instead of waiting on each other
+        jobs = [(system.send_alert, e) for e in immediate_alerts for system in (email_system, slack_system)]
         if len(all_events) > 1:
-            email_system.send_batch_alert(all_events)
-            slack_system.send_batch_alert(all_events)
+            jobs += [(email_system.send_batch_alert, all_events), (slack_system.send_batch_alert, all_events)]
+        
+        with ThreadPoolExecutor(max_workers=min(len(jobs), 32) or 1) as executor:
+            list(executor.map(lambda job: job[0](job[1]), jobs))
+        
+        slack_system.close()
 
 
-def run_continuous_monitoring(interval_minutes: int = 5):
+def run_continuous_monitoring(interval_minutes: int = 5, region: str = None):
     """Run continuous log monitoring"""
     import time
     
@@ -117,22 +129,38 @@ def run_continuous_monitoring(interval_minutes: int = 5):
     print(f"Checking every {interval_minutes} minutes...")
     print("Press Ctrl+C to stop\n")
     
+    # Resolved once rather than on every pass of the loop
+    region = region or os.getenv('AWS_REGION', 'us-east-1')
+    
+    # Checks are anchored to start + k * interval, so the time spent analyzing
+    # is absorbed into the wait instead of pushing every later check back
+    interval = interval_minutes * 60
+    next_tick = time.monotonic()
+    
     try:
         while True:
-            analyze_logs(hours=1, send_alerts=True)
-            print(f"\n Sleeping for {interval_minutes} minutes...")
-            time.sleep(interval_minutes * 60)
+            analyze_logs(hours=1, send_alerts=True, region=region)
+            next_tick += interval
+            now = time.monotonic()
+            if next_tick < now:
+                # An overrun skips the missed slots rather than firing them back to back
+                next_tick += (now - next_tick) // interval * interval + interval
+            print(f"\n Sleeping for {(next_tick - now) / 60:.1f} minutes...")
+            time.sleep(next_tick - now)
     except KeyboardInterrupt:
         print("\n\n Monitoring stopped")
 
 
-def show_stats():
+def show_stats(region: str = None):
     """Show system statistics"""
+    from src.analysis.cloudwatch_analyzer import CloudWatchAnalyzer
+    
     print("=" * 60)
     print(" SYSTEM STATISTICS")
     print("=" * 60)
     
-    region = os.getenv('AWS_REGION', 'us-east-1'); analyzer = CloudWatchAnalyzer(region=region)
+    region = region or os.getenv('AWS_REGION', 'us-east-1')
+    analyzer = CloudWatchAnalyzer(region=region)
     
     periods = [
         ('Last Hour', 1),
@@ -140,9 +168,15 @@ def show_stats():
         ('Last Week', 168),
     ]
     
-    for period_name, hours in periods:
+    # The three windows are independent Logs Insights queries, so they run side by side
+    # on the thread-safe logs client; detection and the DynamoDB writes (the boto3
+    # resource is not thread-safe) then run one window at a time
+    with ThreadPoolExecutor(max_workers=len(periods)) as executor:
+        frames = list(executor.map(lambda period: analyzer.query_s3_access_logs(period[1]), periods))
+    results = [analyzer.analyze_logs(hours=hours, df=df) for (_, hours), df in zip(periods, frames)]
+    
+    for (period_name, hours), events in zip(periods, results):
         print(f"\n{period_name}:")
-        events = analyzer.analyze_logs(hours=hours)
         total = sum(len(e) for e in events.values())
         print(f"  Total Events: {total}")
         for event_type, event_list in events.items():
@@ -150,9 +184,21 @@ def show_stats():
                 print(f"  - {event_type}: {len(event_list)}")
 
 
+def backfill_event_dates(region: str = None):
+    """Add event_date to events stored before the ByTime index existed"""
+    from src.analysis.cloudwatch_analyzer import CloudWatchAnalyzer
+    
+    region = region or os.getenv('AWS_REGION', 'us-east-1')
+    analyzer = CloudWatchAnalyzer(region=region)
+    
+    updated = analyzer.backfill_event_dates()
+    print(f" Added event_date to {updated} stored events")
+
+
 def main():
     """Main CLI entry point"""
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     parser = argparse.ArgumentParser(
         description='Cloud Honey Tokens Attribution System',
@@ -163,6 +209,7 @@ Examples:
   python src/main.py analyze-logs --hours 24
   python src/main.py monitor --interval 5
   python src/main.py stats
+  python src/main.py backfill-event-dates
         '''
     )
     
@@ -171,6 +218,8 @@ Examples:
     gen_parser = subparsers.add_parser('generate-tokens', help='Generate honey tokens')
     gen_parser.add_argument('--region', type=str, help='GCP region')
     gen_parser.add_argument('--bucket', type=str, help='GCS bucket name')
+    gen_parser.add_argument('--fast-keys', action='store_true', help='Fabricate RSA keys instead of generating real ones')
+    gen_parser.add_argument('--key-cache', action='store_true', help='Sample SSH keys from the pregenerated pool at SSH_KEY_CACHE')
     
     analyze_parser = subparsers.add_parser('analyze-logs', help='Analyze logs for threats')
     analyze_parser.add_argument('--hours', type=int, default=24, help='Hours to analyze (default: 24)')
@@ -180,6 +229,7 @@ Examples:
     monitor_parser.add_argument('--interval', type=int, default=5, help='Check interval in minutes (default: 5)')
     
     subparsers.add_parser('stats', help='Show system statistics')
+    subparsers.add_parser('backfill-event-dates', help='Index events stored before the ByTime index existed')
     
     args = parser.parse_args()
     
@@ -187,17 +237,25 @@ Examples:
         parser.print_help()
         return
     
+    # Environment is read once, after .env is loaded, and passed down to each command
+    region = os.getenv('AWS_REGION', 'us-east-1')
+    bucket = os.getenv('S3_BUCKET_NAME')
+    
     if args.command == 'generate-tokens':
-        generate_tokens(region=args.region, bucket_name=args.bucket)
+        generate_tokens(region=args.region or region, bucket_name=args.bucket or bucket,
+                        fast_keys=args.fast_keys, key_cache=args.key_cache)
     
     elif args.command == 'analyze-logs':
-        analyze_logs(hours=args.hours, send_alerts=not args.no_alerts)
+        analyze_logs(hours=args.hours, send_alerts=not args.no_alerts, region=region)
     
     elif args.command == 'monitor':
-        run_continuous_monitoring(interval_minutes=args.interval)
+        run_continuous_monitoring(interval_minutes=args.interval, region=region)
     
     elif args.command == 'stats':
-        show_stats()
+        show_stats(region=region)
+    
+    elif args.command == 'backfill-event-dates':
+        backfill_event_dates(region=region)
 
 
 if __name__ == "__main__":
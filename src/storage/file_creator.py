@@ -5,17 +5,88 @@ Creates realistic-looking honey files and uploads them to GCP Cloud Storage
 
 import os
 import io
-import json
-import csv
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict
+import numpy as np
+import orjson
+import pandas as pd
 from faker import Faker
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from requests.adapters import HTTPAdapter
 
-fake = Faker()
+# Only the providers behind the sampled pools are loaded, which keeps Faker's dispatch short
+fake = Faker(providers=['faker.providers.person', 'faker.providers.internet', 'faker.providers.address'])
+
+FAKER_POOL_SIZE = 1024
+UPLOAD_WORKERS = 16
+
+# US letter in points; the credentials PDF only needs the standard Type 1 fonts
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+PDF_FONTS = {'Helvetica': 'F1', 'Helvetica-Bold': 'F2', 'Courier': 'F3'}
+
+
+@lru_cache(maxsize=None)
+def _faker_pools():
+    """Names, emails, country codes and usernames generated once and sampled for every row"""
+    names = np.array([fake.name() for _ in range(FAKER_POOL_SIZE)])
+    emails = np.array([fake.email() for _ in range(FAKER_POOL_SIZE)])
+    countries = np.array([fake.country_code() for _ in range(FAKER_POOL_SIZE)])
+    usernames = np.array([fake.user_name() for _ in range(FAKER_POOL_SIZE)])
+    return names, emails, countries, usernames
+
+
+def _pdf_text(font: str, size: int, x: float, y: float, text: str) -> str:
+    """Content-stream operators drawing one line of text"""
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f"BT /{PDF_FONTS[font]} {size} Tf {x} {y} Td ({escaped}) Tj ET\n"
+
+
+# The credentials PDF's fixed header and classification line, rendered once at import
+PDF_HEADER = (
+    _pdf_text('Helvetica-Bold', 16, 50, PAGE_HEIGHT - 50, "CONFIDENTIAL - Production Credentials")
+    + "1 0 0 rg\n"
+    + _pdf_text('Helvetica', 10, 50, PAGE_HEIGHT - 80, "️ DO NOT SHARE - Internal Use Only")
+    + "0 0 0 rg\n"
+)
+PDF_CLASSIFICATION = _pdf_text('Helvetica', 8, 50, 20, "© 2025 Company Internal - Classification: CONFIDENTIAL")
+
+
+def _build_pdf(pages: List[str]) -> bytes:
+    """Assemble page content streams into a minimal PDF document"""
+    first_page = 3 + len(PDF_FONTS)
+    kids = ' '.join(f"{first_page + 2 * i} 0 R" for i in range(len(pages)))
+    fonts = ' '.join(f"/{alias} {3 + i} 0 R" for i, alias in enumerate(PDF_FONTS.values()))
+    
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        *(f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>".encode()
+          for name in PDF_FONTS)
+    ]
+    for i, content in enumerate(pages):
+        stream = content.encode('cp1252', errors='ignore')
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {first_page + 2 * i + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
 
 
 class FileCreator:
@@ -30,9 +101,43 @@ class FileCreator:
             project_id: GCP project ID (optional)
         """
         self.bucket_name = bucket_name
-        self.storage_client = storage.Client(project=project_id)
+        
+        # One pooled keep-alive session shared by every upload thread, so the
+        # concurrent uploads reuse connections instead of each paying a TLS handshake
+        credentials, default_project = google.auth.default()
+        session = AuthorizedSession(credentials)
+        session.mount('https://', HTTPAdapter(pool_connections=UPLOAD_WORKERS, pool_maxsize=UPLOAD_WORKERS))
+        self.storage_client = storage.Client(project=project_id or default_project, credentials=credentials, _http=session)
         self.bucket = self.storage_client.bucket(bucket_name)
     
+    @staticmethod
+    def _transactions(rows: int) -> pd.DataFrame:
+        """Fake financial transactions, every column drawn as one array"""
+        names, emails, countries, _ = _faker_pools()
+        rng = np.random.default_rng()
+        today = np.datetime64(datetime.now().date())
+        
+        # Faker only runs once per pool entry; rows are sampled from the pools
+        return pd.DataFrame({
+            'transaction_id': np.char.add('TXN', rng.integers(0, 10 ** 10, rows).astype(str)),
+            'date': today - rng.integers(0, 366, rows).astype('timedelta64[D]'),
+            'customer_name': names[rng.integers(0, len(names), rows)],
+            'email': emails[rng.integers(0, len(emails), rows)],
+            'amount': rng.uniform(10, 10000, rows).round(2),
+            'currency': rng.choice(['USD', 'EUR', 'GBP', 'JPY'], rows),
+            'status': rng.choice(['completed', 'pending', 'failed'], rows),
+            'payment_method': rng.choice(['credit_card', 'debit_card', 'paypal', 'bank_transfer'], rows),
+            'country': countries[rng.integers(0, len(countries), rows)]
+        })
+    
+    @staticmethod
+    def _csv_buffer(df: pd.DataFrame) -> io.BytesIO:
+        """Write a DataFrame as UTF-8 CSV into a rewound buffer"""
+        buffer = io.BytesIO()
+        df.to_csv(buffer, index=False, encoding='utf-8')
+        buffer.seek(0)
+        return buffer
+    
     def create_csv_file(self, filename: str, rows: int = 5000) -> io.BytesIO:
         """
         Create a fake CSV file with financial data
@@ -44,155 +149,161 @@ class FileCreator:
         Returns:
             BytesIO object containing CSV data
         """
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        writer.writerow([
-            'transaction_id', 'date', 'customer_name', 'email', 
-            'amount', 'currency', 'status', 'payment_method', 'country'
-        ])
-        
-        for i in range(rows):
-            writer.writerow([
-                f"TXN{fake.random_number(digits=10)}",
-                fake.date_between(start_date='-1y', end_date='today'),
-                fake.name(),
-                fake.email(),
-                round(fake.random.uniform(10, 10000), 2),
-                fake.random_element(['USD', 'EUR', 'GBP', 'JPY']),
-                fake.random_element(['completed', 'pending', 'failed']),
-                fake.random_element(['credit_card', 'debit_card', 'paypal', 'bank_transfer']),
-                fake.country_code()
-            ])
+        return self._csv_buffer(self._transactions(rows))
+    
+    def create_csv_files(self, row_counts: Dict[str, int]) -> Dict[str, io.BytesIO]:
+        """
+        Create several fake financial CSV files from one set of random draws
         
-        output.seek(0)
-        return io.BytesIO(output.getvalue().encode('utf-8'))
+        Args:
+            row_counts: Dictionary of filename -> number of rows
+            
+        Returns:
+            Dictionary of filename -> BytesIO object containing CSV data
+        """
+        df = self._transactions(sum(row_counts.values()))
+        
+        files = {}
+        offset = 0
+        for filename, rows in row_counts.items():
+            files[filename] = self._csv_buffer(df.iloc[offset:offset + rows])
+            offset += rows
+        return files
     
-    def create_credentials_pdf(self, filename: str, credentials: Dict) -> io.BytesIO:
+    def create_credentials_pdf(self, filename: str, credentials: Dict, generated: datetime = None) -> io.BytesIO:
         """
         Create a fake PDF with credentials
         
         Args:
             filename: Name of the file
             credentials: Dictionary of credentials to include
+            generated: Timestamp stamped on the file (defaults to now)
             
         Returns:
             BytesIO object containing PDF data
         """
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-        
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(50, height - 50, "CONFIDENTIAL - Production Credentials")
-        
-        c.setFont("Helvetica", 10)
-        c.setFillColorRGB(1, 0, 0)
-        c.drawString(50, height - 80, "️ DO NOT SHARE - Internal Use Only")
-        c.setFillColorRGB(0, 0, 0)
-        
-        c.setFont("Helvetica", 12)
-        y_position = height - 120
+        generated = generated or datetime.now()
+        ops = [PDF_HEADER]
+        pages = []
+        y_position = PAGE_HEIGHT - 120
         
         for key, value in credentials.items():
             if y_position < 100:
-                c.showPage()
-                y_position = height - 50
+                pages.append(''.join(ops))
+                ops = []
+                y_position = PAGE_HEIGHT - 50
             
-            c.drawString(50, y_position, f"{key}:")
-            c.setFont("Courier", 10)
-            c.drawString(70, y_position - 15, str(value))
-            c.setFont("Helvetica", 12)
+            ops.append(_pdf_text('Helvetica', 12, 50, y_position, f"{key}:"))
+            ops.append(_pdf_text('Courier', 10, 70, y_position - 15, str(value)))
             y_position -= 40
         
-        c.setFont("Helvetica", 8)
-        c.drawString(50, 30, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        c.drawString(50, 20, "© 2025 Company Internal - Classification: CONFIDENTIAL")
+        ops.append(_pdf_text('Helvetica', 8, 50, 30, f"Generated: {generated:%Y-%m-%d %H:%M:%S}"))
+        ops.append(PDF_CLASSIFICATION)
+        pages.append(''.join(ops))
         
-        c.save()
-        buffer.seek(0)
-        return buffer
+        return io.BytesIO(_build_pdf(pages))
     
-    def create_sql_dump(self, filename: str) -> io.BytesIO:
+    def create_sql_dump(self, filename: str, generated: datetime = None) -> io.BytesIO:
         """
         Create a fake SQL dump file
         
         Args:
             filename: Name of the file
+            generated: Timestamp stamped on the dump (defaults to now)
             
         Returns:
             BytesIO object containing SQL data
         """
-        output = io.StringIO()
-        
-        output.write("-- MySQL dump 10.13  Distrib 8.0.35, for Linux (x86_64)\n")
-        output.write(f"-- Host: prod-db-01.region-a.cloud    Database: production\n")
-        output.write(f"-- Dump completed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        output.write("-- Table structure for table `users`\n")
-        output.write("DROP TABLE IF EXISTS `users`;\n")
-        output.write("CREATE TABLE `users` (\n")
-        output.write("  `id` int(11) NOT NULL AUTO_INCREMENT,\n")
-        output.write("  `username` varchar(50) NOT NULL,\n")
-        output.write("  `email` varchar(100) NOT NULL,\n")
-        output.write("  `password_hash` varchar(255) NOT NULL,\n")
-        output.write("  `created_at` timestamp DEFAULT CURRENT_TIMESTAMP,\n")
-        output.write("  PRIMARY KEY (`id`)\n")
-        output.write(") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;\n\n")
-        
-        output.write("-- Dumping data for table `users`\n")
-        output.write("INSERT INTO `users` VALUES\n")
-        
-        for i in range(100):
-            comma = "," if i < 99 else ";"
-            output.write(f"({i+1},'{fake.user_name()}','{fake.email()}','{fake.sha256()}','{fake.date_time_this_year()}'){comma}\n")
+        generated = generated or datetime.now()
+        output = io.BytesIO()
+        
+        output.write(b"-- MySQL dump 10.13  Distrib 8.0.35, for Linux (x86_64)\n")
+        output.write(b"-- Host: prod-db-01.region-a.cloud    Database: production\n")
+        output.write(f"-- Dump completed on {generated:%Y-%m-%d %H:%M:%S}\n\n".encode())
+        
+        output.write(b"-- Table structure for table `users`\n")
+        output.write(b"DROP TABLE IF EXISTS `users`;\n")
+        output.write(b"CREATE TABLE `users` (\n")
+        output.write(b"  `id` int(11) NOT NULL AUTO_INCREMENT,\n")
+        output.write(b"  `username` varchar(50) NOT NULL,\n")
+        output.write(b"  `email` varchar(100) NOT NULL,\n")
+        output.write(b"  `password_hash` varchar(255) NOT NULL,\n")
+        output.write(b"  `created_at` timestamp DEFAULT CURRENT_TIMESTAMP,\n")
+        output.write(b"  PRIMARY KEY (`id`)\n")
+        output.write(b") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;\n\n")
+        
+        output.write(b"-- Dumping data for table `users`\n")
+        output.write(b"INSERT INTO `users` VALUES\n")
+        
+        rows = 100
+        _, emails, _, usernames = _faker_pools()
+        rng = np.random.default_rng()
+        now = generated.replace(microsecond=0)
+        year_start = np.datetime64(now.replace(month=1, day=1, hour=0, minute=0, second=0), 's')
+        seconds_elapsed = int((np.datetime64(now, 's') - year_start) / np.timedelta64(1, 's'))
+        created = np.datetime_as_string(year_start + rng.integers(0, seconds_elapsed + 1, rows).astype('timedelta64[s]'))
+        # One random draw supplies every 32-byte "hash"; hex() on a slice is far cheaper than hashing
+        hashes = os.urandom(32 * rows)
+        
+        output.write(",\n".join(
+            f"({i + 1},'{username}','{email}','{hashes[32 * i:32 * (i + 1)].hex()}','{timestamp.replace('T', ' ')}')"
+            for i, (username, email, timestamp) in enumerate(zip(
+                usernames[rng.integers(0, len(usernames), rows)],
+                emails[rng.integers(0, len(emails), rows)],
+                created
+            ))
+        ).encode())
+        output.write(b";\n")
         
         output.seek(0)
-        return io.BytesIO(output.getvalue().encode('utf-8'))
+        return output
     
-    def create_env_file(self, filename: str, config: Dict) -> io.BytesIO:
+    def create_env_file(self, filename: str, config: Dict, generated: datetime = None) -> io.BytesIO:
         """
         Create a fake .env file
         
         Args:
             filename: Name of the file
             config: Dictionary of environment variables
+            generated: Timestamp stamped on the file (defaults to now)
             
         Returns:
             BytesIO object containing .env data
         """
-        output = io.StringIO()
+        generated = generated or datetime.now()
+        output = io.BytesIO()
         
-        output.write("
-        output.write(f"
-        output.write("
+        output.write(b"# Production Environment Configuration\n")
+        output.write(f"# Generated: {generated:%Y-%m-%d %H:%M:%S}\n".encode())
+        output.write(b"# DO NOT COMMIT TO VERSION CONTROL\n\n")
         
         for key, value in config.items():
-            output.write(f"{key}={value}\n")
+            output.write(f"{key}={value}\n".encode())
         
         output.seek(0)
-        return io.BytesIO(output.getvalue().encode('utf-8'))
+        return output
     
-    def create_json_credentials(self, filename: str, credentials: Dict) -> io.BytesIO:
+    def create_json_credentials(self, filename: str, credentials: Dict, generated: datetime = None) -> io.BytesIO:
         """
         Create a fake JSON credentials file
         
         Args:
             filename: Name of the file
             credentials: Dictionary of credentials
+            generated: Timestamp recorded as last_updated (defaults to now)
             
         Returns:
             BytesIO object containing JSON data
         """
         data = {
             "version": "1.0",
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": generated or datetime.now(),
             "environment": "production",
             "credentials": credentials
         }
         
-        json_str = json.dumps(data, indent=2)
-        return io.BytesIO(json_str.encode('utf-8'))
+        # orjson emits UTF-8 bytes and formats the datetime itself, matching isoformat()
+        return io.BytesIO(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     def create_zip_archive(self, filename: str, files_dict: Dict[str, io.BytesIO]) -> io.BytesIO:
         """
@@ -207,10 +318,12 @@ class FileCreator:
         """
         buffer = io.BytesIO()
         
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        # Archive size is irrelevant for a decoy, so entries are stored rather than deflated
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_file:
             for name, content in files_dict.items():
-                content.seek(0)
-                zip_file.writestr(name, content.read())
+                # getbuffer() hands zipfile a view of each entry instead of a copy of its bytes
+                with content.getbuffer() as view:
+                    zip_file.writestr(name, view)
         
         buffer.seek(0)
         return buffer
@@ -223,7 +336,7 @@ class FileCreator:
         
         Args:
             filename: Name of the file in GCS
-            content: File content as BytesIO
+            content: File content as BytesIO; read whole via getvalue(), so its position does not matter
             content_type: MIME type of the file
             metadata: Optional metadata dictionary
             
@@ -235,8 +348,8 @@ class FileCreator:
         if metadata:
             blob.metadata = metadata
         
-        content.seek(0)
-        blob.upload_from_file(content, content_type=content_type)
+        # Honey files are small, so a single-request upload of the whole buffer is cheapest
+        blob.upload_from_string(content.getvalue(), content_type=content_type)
         
         print(f" Uploaded: {filename} to gs://{self.bucket_name}/{filename}")
         
@@ -255,31 +368,29 @@ class FileCreator:
         Returns:
             List of uploaded file URLs
         """
-        uploaded_files = []
+        # Files are built first and uploaded together, so the per-file round trips overlap
+        uploads = []
+        # One timestamp for the whole set; the files also look like a single export that way
+        now = datetime.now()
         
         print("\n Creating CSV files...")
-        csv1 = self.create_csv_file("2025_financials_Q3.csv", rows=5000)
-        uploaded_files.append(self.upload_to_gcs(
-            "2025_financials_Q3.csv", csv1, "text/csv"
-        ))
-        
-        csv2 = self.create_csv_file("2025_financials_Q4.csv", rows=4500)
-        uploaded_files.append(self.upload_to_gcs(
-            "2025_financials_Q4.csv", csv2, "text/csv"
-        ))
+        # The ZIP's customer list comes out of the same draw as the two financial exports
+        csv_files = self.create_csv_files({
+            "2025_financials_Q3.csv": 5000,
+            "2025_financials_Q4.csv": 4500,
+            "customers.csv": 1000
+        })
+        for name in ("2025_financials_Q3.csv", "2025_financials_Q4.csv"):
+            uploads.append((name, csv_files[name], "text/csv"))
         
         print("\n Creating PDF files...")
         pdf_creds = {**api_keys, **db_credentials[0]}
-        pdf = self.create_credentials_pdf("backup_credentials.pdf", pdf_creds)
-        uploaded_files.append(self.upload_to_gcs(
-            "backup_credentials.pdf", pdf, "application/pdf"
-        ))
+        pdf = self.create_credentials_pdf("backup_credentials.pdf", pdf_creds, generated=now)
+        uploads.append(("backup_credentials.pdf", pdf, "application/pdf"))
         
         print("\n Creating SQL dump...")
-        sql = self.create_sql_dump("database_backup_2025.sql")
-        uploaded_files.append(self.upload_to_gcs(
-            "database_backup_2025.sql", sql, "application/sql"
-        ))
+        sql = self.create_sql_dump("database_backup_2025.sql", generated=now)
+        uploads.append(("database_backup_2025.sql", sql, "application/sql"))
         
         print("\n️  Creating .env file...")
         env_config = {
@@ -290,50 +401,43 @@ class FileCreator:
             "NODE_ENV": "production",
             "PORT": "3000"
         }
-        env = self.create_env_file(".env.production", env_config)
-        uploaded_files.append(self.upload_to_gcs(
-            ".env.production", env, "text/plain"
-        ))
+        env = self.create_env_file(".env.production", env_config, generated=now)
+        uploads.append((".env.production", env, "text/plain"))
         
         print("\n Creating JSON credentials...")
         json_creds = self.create_json_credentials("aws_credentials.json", {
             "aws_access_key_id": api_keys['aws_access_key_id'],
             "aws_secret_access_key": api_keys['aws_secret_access_key'],
             "region": "us-east-1"
-        })
-        uploaded_files.append(self.upload_to_gcs(
-            "aws_credentials.json", json_creds, "application/json"
-        ))
+        }, generated=now)
+        uploads.append(("aws_credentials.json", json_creds, "application/json"))
         
         print("\n Creating API keys file...")
-        api_text = io.StringIO()
-        api_text.write("
+        api_bytes = io.BytesIO()
+        api_bytes.write(b"# Production API Keys - CONFIDENTIAL\n")
         for key, value in api_keys.items():
-            api_text.write(f"{key}={value}\n")
-        api_text.seek(0)
-        api_bytes = io.BytesIO(api_text.getvalue().encode('utf-8'))
-        uploaded_files.append(self.upload_to_gcs(
-            "api_keys_production.txt", api_bytes, "text/plain"
-        ))
+            api_bytes.write(f"{key}={value}\n".encode())
+        api_bytes.seek(0)
+        uploads.append(("api_keys_production.txt", api_bytes, "text/plain"))
         
         print("\n Creating SSH key files...")
         for i, key in enumerate(ssh_keys[:2]):
             ssh_file = io.BytesIO(key['private_key'].encode('utf-8'))
             filename = f"id_{key['type']}_{i+1}"
-            uploaded_files.append(self.upload_to_gcs(
-                filename, ssh_file, "text/plain"
-            ))
+            uploads.append((filename, ssh_file, "text/plain"))
         
         print("\n Creating ZIP archive...")
         zip_files = {
-            "customers.csv": self.create_csv_file("customers.csv", 1000),
+            "customers.csv": csv_files["customers.csv"],
             "credentials.txt": io.BytesIO(f"DB_USER={db_credentials[1]['username']}\nDB_PASS={db_credentials[1]['password']}".encode()),
             "README.txt": io.BytesIO(b"Customer database dump for Region A")
         }
         zip_archive = self.create_zip_archive("customer_dump_region_A.zip", zip_files)
-        uploaded_files.append(self.upload_to_gcs(
-            "customer_dump_region_A.zip", zip_archive, "application/zip"
-        ))
+        uploads.append(("customer_dump_region_A.zip", zip_archive, "application/zip"))
+        
+        print(f"\n Uploading {len(uploads)} files...")
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            uploaded_files = list(executor.map(lambda task: self.upload_to_gcs(*task), uploads))
         
         print(f"\n Successfully uploaded {len(uploaded_files)} files!")
         return uploaded_files
@@ -5,35 +5,98 @@ Creates realistic honey files and uploads to S3
 
 import os
 import io
+import base64
 import csv
-import json
+import gzip
+import random
+import secrets
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from faker import Faker
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from functools import lru_cache
+import orjson
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-fake = Faker()
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'total_max_attempts': 5}
+)
+
+# Honey files are normally far below this, but anything larger is sent as parallel multipart chunks
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_THRESHOLD,
+    max_concurrency=10,
+    use_threads=True
+)
+
+# Amount parts for the CSV: whole dollars are drawn from the range, cents looked up pre-padded
+DOLLARS = range(100, 50001)
+CENTS = [f"{cents:02d}" for cents in range(100)]
+
+# Text payloads above this size may be stored gzip-encoded when S3_GZIP_TEXT_UPLOADS is set
+GZIP_CONTENT_TYPES = {'text/csv', 'text/plain', 'application/json', 'application/sql'}
+GZIP_MIN_SIZE = 1024
+
+
+@lru_cache(maxsize=None)
+def _faker():
+    """Faker instance, built on first use so importing the module stays cheap"""
+    from faker import Faker
+    return Faker()
+
+
+@lru_cache(maxsize=8)
+def _s3_client(region):
+    """S3 client shared by every file creator in the same region"""
+    return boto3.client('s3', region_name=region, config=CLIENT_CONFIG)
 
 
 class S3FileCreator:
     """Creates and uploads honey files to AWS S3"""
     
+    # Buckets whose access logging was already configured by this process
+    _logging_enabled_buckets = set()
+    
     def __init__(self, bucket_name=None, region=None):
         """Initialize S3 client"""
         self.bucket_name = bucket_name or os.getenv('S3_BUCKET_NAME', 'honey-tokens-storage')
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
+        # Off by default: clients that ignore Content-Encoding (the AWS CLI, boto3) would
+        # download the gzip bytes as-is, which makes the decoy files look wrong
+        self.gzip_text = os.getenv('S3_GZIP_TEXT_UPLOADS', 'false').lower() == 'true'
         
-        self.s3_client = boto3.client('s3', region_name=self.region)
+        self.s3_client = _s3_client(self.region)
         
         self._enable_bucket_logging()
     
+    def _logging_configured(self, log_bucket):
+        """Whether the bucket already sends access logs to log_bucket; unknown counts as no"""
+        try:
+            status = self.s3_client.get_bucket_logging(Bucket=self.bucket_name)
+        except ClientError:
+            return False
+        return status.get('LoggingEnabled', {}).get('TargetBucket') == log_bucket
+    
     def _enable_bucket_logging(self):
-        """Enable S3 access logging for the bucket"""
+        """Enable S3 access logging for the bucket, once per bucket per process"""
+        if self.bucket_name in S3FileCreator._logging_enabled_buckets:
+            return
+        
         try:
             log_bucket = f"{self.bucket_name}-logs"
+            # One authoritative read; setup only runs when logging is off or points elsewhere
+            if self._logging_configured(log_bucket):
+                S3FileCreator._logging_enabled_buckets.add(self.bucket_name)
+                return
+            
             try:
                 self.s3_client.head_bucket(Bucket=log_bucket)
             except ClientError:
@@ -55,6 +118,7 @@ class S3FileCreator:
                 Bucket=self.bucket_name,
                 BucketLoggingStatus=logging_config
             )
+            S3FileCreator._logging_enabled_buckets.add(self.bucket_name)
             print(f" S3 access logging enabled for bucket: {self.bucket_name}")
             
         except ClientError as e:
@@ -62,65 +126,79 @@ class S3FileCreator:
     
     def create_csv_file(self, filename="financial_data_Q4_2024.csv"):
         """Create a CSV file with fake financial data"""
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
+        fake = _faker()
+        # The writer encodes straight into the byte buffer, so there is no str copy to re-encode
+        buffer = io.BytesIO()
+        text = io.TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True)
+        writer = csv.writer(text)
         
         writer.writerow(['Date', 'Transaction_ID', 'Amount', 'Account_Number', 'Description'])
         
-        for _ in range(100):
-            writer.writerow([
-                fake.date_this_year(),
-                fake.uuid4(),
-                f"${fake.random_int(100, 50000)}.{fake.random_int(0, 99):02d}",
-                fake.bban(),
-                fake.sentence()
-            ])
+        # Each column is generated in its own tight comprehension, then zipped into rows
+        rows = 100
+        dates = [fake.date_this_year() for _ in range(rows)]
+        ids = [fake.uuid4() for _ in range(rows)]
+        amounts = [
+            f"${dollars}.{CENTS[cents]}"
+            for dollars, cents in zip(random.choices(DOLLARS, k=rows), random.choices(range(100), k=rows))
+        ]
+        accounts = [fake.bban() for _ in range(rows)]
+        descriptions = [fake.sentence() for _ in range(rows)]
+        
+        writer.writerows(zip(dates, ids, amounts, accounts, descriptions))
         
-        return filename, buffer.getvalue().encode('utf-8'), 'text/csv'
+        text.flush()
+        text.detach()
+        buffer.seek(0)
+        return filename, buffer, 'text/csv'
     
     def create_credentials_pdf(self, api_keys, db_creds, filename="credentials_backup.pdf"):
         """Create a PDF with fake credentials"""
+        # ReportLab pulls in dozens of submodules, so it is only loaded when a PDF is built
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+        
         buffer = io.BytesIO()
         c = canvas.Canvas(buffer, pagesize=letter)
         
         c.setFont("Helvetica-Bold", 16)
         c.drawString(100, 750, "System Credentials - CONFIDENTIAL")
         
-        y_position = 700
-        c.setFont("Helvetica", 12)
-        
-        c.drawString(100, y_position, "API Keys:")
-        y_position -= 20
+        # One text object carries every line; each font's leading is the gap below its line
+        text = c.beginText(100, 700)
+        text.setFont("Helvetica", 12, leading=20)
+        text.textLine("API Keys:")
+        text.moveCursor(20, 0)
         
         for key_type, key_value in list(api_keys.items())[:5]:
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(120, y_position, f"{key_type}:")
-            y_position -= 15
-            c.setFont("Courier", 9)
-            c.drawString(120, y_position, str(key_value)[:60])
-            y_position -= 25
+            text.setFont("Helvetica-Bold", 10, leading=15)
+            text.textLine(f"{key_type}:")
+            text.setFont("Courier", 9, leading=25)
+            text.textLine(str(key_value)[:60])
         
-        c.setFont("Helvetica", 12)
-        c.drawString(100, y_position, "Database Credentials:")
-        y_position -= 20
+        text.moveCursor(-20, 0)
+        text.setFont("Helvetica", 12, leading=20)
+        text.textLine("Database Credentials:")
+        text.moveCursor(20, 0)
         
         for creds in db_creds[:2]:
             db_type = creds.get('type', 'unknown').upper()
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(120, y_position, f"{db_type}:")
-            y_position -= 15
-            c.setFont("Courier", 8)
+            text.setFont("Helvetica-Bold", 10, leading=15)
+            text.textLine(f"{db_type}:")
+            text.setFont("Courier", 8, leading=12)
             for key, value in creds.items():
-                if key != 'type' and y_position > 50:
-                    c.drawString(120, y_position, f"{key}: {value}")
-                    y_position -= 12
-            y_position -= 10
+                if key != 'type' and text.getY() > 50:
+                    text.textLine(f"{key}: {value}")
+            text.moveCursor(0, 10)
         
+        c.drawText(text)
         c.save()
-        return filename, buffer.getvalue(), 'application/pdf'
+        buffer.seek(0)
+        return filename, buffer, 'application/pdf'
     
     def create_sql_dump(self, db_creds, filename="database_backup.sql"):
         """Create a fake SQL dump file"""
+        fake = _faker()
         creds = db_creds[0] if db_creds else {}
         
         sql_content = f"""-- Database Backup
@@ -148,53 +226,53 @@ CREATE TABLE users (
 INSERT INTO users (username, email, password_hash) VALUES
 """
         
-        for i in range(10):
-            sql_content += f"('{fake.user_name()}', '{fake.email()}', '{fake.sha256()}'),\n"
+        sql_content += ",\n".join(
+            f"('{fake.user_name()}', '{fake.email()}', '{secrets.token_hex(32)}')" for _ in range(10)
+        ) + ";\n"
         
-        sql_content = sql_content.rstrip(',\n') + ';\n'
-        
-        return filename, sql_content.encode('utf-8'), 'application/sql'
+        return filename, io.BytesIO(sql_content.encode('utf-8')), 'application/sql'
     
     def create_env_file(self, api_keys, filename=".env.production"):
         """Create a fake .env file"""
-        env_content = f"""
+        parts = [f"""# Production Environment Configuration
+# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-"""
+"""]
         
         for key_type, key_value in api_keys.items():
             env_name = key_type.upper().replace(' ', '_').replace('-', '_')
-            env_content += f"{env_name}={key_value}\n"
+            parts.append(f"{env_name}={key_value}\n")
         
-        env_content += f"""
+        parts.append(f"""
 DB_HOST=prod-db-cluster.us-east-1.rds.amazonaws.com
 DB_PORT=5432
 DB_NAME=production
 DB_USER=admin
-DB_PASSWORD={fake.password(length=20)}
+DB_PASSWORD={secrets.token_urlsafe(15)}
 
-AWS_ACCESS_KEY_ID={fake.sha256()[:20]}
-AWS_SECRET_ACCESS_KEY={fake.sha256()}
-"""
+AWS_ACCESS_KEY_ID={secrets.token_hex(10)}
+AWS_SECRET_ACCESS_KEY={secrets.token_hex(32)}
+""")
         
-        return filename, env_content.encode('utf-8'), 'text/plain'
+        return filename, io.BytesIO(''.join(parts).encode('utf-8')), 'text/plain'
     
     def create_json_config(self, api_keys, filename="config.production.json"):
         """Create a fake JSON configuration file"""
         config = {
             "environment": "production",
             "version": "2.1.0",
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": datetime.now(),
             "api_keys": api_keys,
             "database": {
                 "host": "prod-cluster.cluster-xyz.us-east-1.rds.amazonaws.com",
                 "port": 5432,
                 "username": "prod_user",
-                "password": fake.password(length=16)
+                "password": secrets.token_urlsafe(12)
             },
             "aws": {
                 "region": "us-east-1",
-                "access_key": fake.sha256()[:20],
-                "secret_key": fake.sha256()
+                "access_key": secrets.token_hex(10),
+                "secret_key": secrets.token_hex(32)
             },
             "services": {
                 "api_endpoint": "https://api.production.company.com",
@@ -202,31 +280,31 @@ AWS_SECRET_ACCESS_KEY={fake.sha256()}
             }
         }
         
-        json_content = json.dumps(config, indent=2)
-        return filename, json_content.encode('utf-8'), 'application/json'
+        # Kept indented so the decoy reads like a hand-maintained config; orjson emits the bytes directly
+        return filename, io.BytesIO(orjson.dumps(config, option=orjson.OPT_INDENT_2)), 'application/json'
     
     def create_text_file(self, api_keys, filename="api_keys_backup.txt"):
         """Create a plain text file with credentials"""
-        content = f"""API Keys and Credentials Backup
+        parts = [f"""API Keys and Credentials Backup
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 {'=' * 60}
 
-"""
-        for key_type, key_value in api_keys.items():
-            content += f"{key_type}:\n{key_value}\n\n"
+"""]
+        parts.extend(f"{key_type}:\n{key_value}\n\n" for key_type, key_value in api_keys.items())
         
-        return filename, content.encode('utf-8'), 'text/plain'
+        return filename, io.BytesIO(''.join(parts).encode('utf-8')), 'text/plain'
     
-    def create_zip_archive(self, api_keys, db_creds, ssh_keys, filename="credentials_archive.zip"):
-        """Create a ZIP file with multiple credential files"""
+    def create_zip_archive(self, api_keys, db_creds, ssh_keys, filename="credentials_archive.zip",
+                           env_file=None, json_file=None):
+        """Create a ZIP file with multiple credential files, reusing prebuilt .env/JSON files when given"""
+        env_name, env_content, _ = env_file or self.create_env_file(api_keys)
+        json_name, json_content, _ = json_file or self.create_json_config(api_keys)
         buffer = io.BytesIO()
         
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            env_name, env_content, _ = self.create_env_file(api_keys)
-            zip_file.writestr(env_name, env_content)
-            
-            json_name, json_content, _ = self.create_json_config(api_keys)
-            zip_file.writestr(json_name, json_content)
+        # Archive size is irrelevant for a decoy, so entries are stored rather than deflated
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr(env_name, env_content.getbuffer())
+            zip_file.writestr(json_name, json_content.getbuffer())
             
             for i, key_data in enumerate(ssh_keys[:3]):
                 key_type = key_data.get('type', f'key{i}')
@@ -248,27 +326,53 @@ Last updated: {datetime.now().strftime('%Y-%m-%d')}
 """
             zip_file.writestr("README.txt", readme)
         
-        return filename, buffer.getvalue(), 'application/zip'
+        buffer.seek(0)
+        return filename, buffer, 'application/zip'
     
-    def upload_to_s3(self, filename, content, content_type):
-        """Upload file to S3"""
+    def upload_to_s3(self, filename, content, content_type, created_at=None):
+        """Upload a file to S3 from a BytesIO positioned at its start"""
+        extra_args = {
+            'ContentType': content_type,
+            'Metadata': {
+                'honey-token': 'true',
+                'created-at': created_at or datetime.now().isoformat()
+            }
+        }
+        size = content.getbuffer().nbytes
+        
+        if self.gzip_text and content_type in GZIP_CONTENT_TYPES and size > GZIP_MIN_SIZE:
+            content = io.BytesIO(gzip.compress(content.getbuffer(), compresslevel=6))
+            size = content.getbuffer().nbytes
+            extra_args['ContentEncoding'] = 'gzip'
+        
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=filename,
-                Body=content,
-                ContentType=content_type,
-                Metadata={
-                    'honey-token': 'true',
-                    'created-at': datetime.now().isoformat()
-                }
-            )
+            if size >= MULTIPART_THRESHOLD:
+                # Large payloads go through the transfer manager, which uploads parts in parallel
+                self.s3_client.upload_fileobj(
+                    content,
+                    self.bucket_name,
+                    filename,
+                    ExtraArgs=extra_args,
+                    Config=MULTIPART_CONFIG
+                )
+            else:
+                # A precomputed CRC32 (zlib, in C) lets botocore skip hashing the body itself,
+                # and S3 still verifies the upload against it
+                checksum = base64.b64encode(zlib.crc32(content.getbuffer()).to_bytes(4, 'big')).decode('ascii')
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=filename,
+                    Body=content,
+                    ChecksumAlgorithm='CRC32',
+                    ChecksumCRC32=checksum,
+                    **extra_args
+                )
             
             s3_url = f"s3://{self.bucket_name}/{filename}"
             print(f" Uploaded to S3: {s3_url}")
             return s3_url
             
-        except ClientError as e:
+        except (ClientError, S3UploadFailedError) as e:
             print(f" Failed to upload {filename}: {e}")
             return None
     
@@ -280,18 +384,27 @@ Last updated: {datetime.now().strftime('%Y-%m-%d')}
         print(f"Creating and uploading honey files to S3...")
         print(f"{'='*60}\n")
         
+        # The archive reuses the standalone .env and JSON files rather than rolling new values
+        env_file = self.create_env_file(api_keys)
+        json_file = self.create_json_config(api_keys)
+        
         files_to_create = [
             self.create_csv_file(),
             self.create_credentials_pdf(api_keys, db_creds),
             self.create_sql_dump(db_creds),
-            self.create_env_file(api_keys),
-            self.create_json_config(api_keys),
+            env_file,
+            json_file,
             self.create_text_file(api_keys),
-            self.create_zip_archive(api_keys, db_creds, ssh_keys),
+            self.create_zip_archive(api_keys, db_creds, ssh_keys, env_file=env_file, json_file=json_file),
         ]
         
-        for filename, content, content_type in files_to_create:
-            s3_url = self.upload_to_s3(filename, content, content_type)
+        # put_object is latency-bound and the boto3 client is thread-safe, so the PUTs overlap;
+        # the whole set shares one created-at stamp
+        created_at = datetime.now().isoformat()
+        with ThreadPoolExecutor(max_workers=len(files_to_create)) as executor:
+            s3_urls = list(executor.map(lambda file: self.upload_to_s3(*file, created_at=created_at), files_to_create))
+        
+        for (filename, content, content_type), s3_url in zip(files_to_create, s3_urls):
             if s3_url:
                 uploaded_files.append({
                     'filename': filename,